@@ -1,102 +1,298 @@
-import requests
+"""
+Cliente da API Pikachu para scripts de smoke test e geração de carga.
+
+`PikachuClient` usa uma `requests.Session` com pool de conexões e timeouts;
+`AsyncPikachuClient` é a versão assíncrona (httpx). Os dois têm `batch`, que
+roda várias chamadas em paralelo com limite de concorrência, e guardam a
+latência de cada chamada em `stats` (p50/p95/p99 por endpoint).
+
+A URL base vem de PIKACHU_API_URL (padrão http://localhost:5000). As funções
+de módulo (`get_nasa_apod()`, `get_pokemon_by_name()`, ...) continuam
+disponíveis e usam um cliente compartilhado.
+
+Uso:
+    python api_client.py
+    python api_client.py --base-url http://localhost:8000 --pokemon pikachu bulbasaur --concurrency 16
+"""
+
+import argparse
+import asyncio
 import json
-from datetime import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # httpx é opcional; sem ele só há o cliente síncrono
+    httpx = None
+
+DEFAULT_BASE_URL = os.environ.get('PIKACHU_API_URL', 'http://localhost:5000')
+DEFAULT_TIMEOUT = (3.05, 30)  # (conexão, leitura)
+DEFAULT_CONCURRENCY = 8
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por posição mais próxima numa lista já ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class LatencyStats:
+    """Latências (ms) e erros por nome de chamada"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, name, elapsed_ms, ok=True):
+        with self.lock:
+            self.samples.setdefault(name, []).append(elapsed_ms)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.errors.clear()
+
+    def summary(self):
+        with self.lock:
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+            errors = dict(self.errors)
+        return {
+            name: {
+                'count': len(values),
+                'errors': errors.get(name, 0),
+                'mean_ms': round(sum(values) / len(values), 2),
+                'p50_ms': round(percentile(values, 0.50), 2),
+                'p95_ms': round(percentile(values, 0.95), 2),
+                'p99_ms': round(percentile(values, 0.99), 2),
+                'max_ms': round(values[-1], 2),
+            }
+            for name, values in samples.items()
+        }
+
+
+class PikachuClient:
+    """Cliente síncrono com sessão HTTP reaproveitada"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_CONCURRENCY * 2,
+                 stats=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.stats = stats or LatencyStats()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def request(self, name, method, path, **kwargs):
+        """JSON da resposta ou {"error": ...}; a latência fica em `stats[name]`"""
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.stats.record(name, (time.perf_counter() - start) * 1000, ok=False)
+            return {"error": str(e)}
+        self.stats.record(name, (time.perf_counter() - start) * 1000)
+        return data
+
+    # --- NASA APOD API ---
+    def get_nasa_apod(self):
+        return self.request('apod', 'GET', '/api/nasa/apod')
+
+    # --- PokeAPI ---
+    def get_pokemon_by_name(self, name):
+        return self.request('pokemon', 'GET', f'/api/pokemon/{name}')
+
+    def get_random_pokemon(self):
+        return self.request('pokemon-random', 'GET', '/api/pokemon/random')
+
+    # --- Horoscope API ---
+    def get_horoscope(self, sign):
+        return self.request('horoscope', 'GET', f'/api/horoscope/{sign}')
+
+    # --- Astronomy APIs ---
+    def get_moon_phase(self):
+        return self.request('moon-phase', 'GET', '/api/astronomy/moon-phase')
+
+    def get_iss_location(self):
+        return self.request('iss-location', 'GET', '/api/astronomy/iss-location')
+
+    def get_people_in_space(self):
+        return self.request('people-in-space', 'GET', '/api/astronomy/people-in-space')
+
+    def get_space_summary(self, sign="aries"):
+        """APOD, ISS, pessoas no espaço, fase da lua e horóscopo em uma só chamada"""
+        return self.request('space-summary', 'GET', '/api/space/summary', params={"sign": sign})
+
+    # --- Em lote ---
+    def batch(self, calls, concurrency=DEFAULT_CONCURRENCY):
+        """Executa `calls` (funções sem argumento) em paralelo; resultados na mesma ordem"""
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda call: call(), calls))
+
+    def get_pokemon_batch(self, names, concurrency=DEFAULT_CONCURRENCY):
+        return self.batch([lambda name=name: self.get_pokemon_by_name(name) for name in names], concurrency)
+
+
+class AsyncPikachuClient:
+    """Versão assíncrona (httpx) do PikachuClient"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, pool_size=100, stats=None):
+        if httpx is None:
+            raise RuntimeError("httpx não está instalado: pip install httpx")
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats or LatencyStats()
+        connect_timeout, read_timeout = timeout
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def request(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            self.stats.record(name, (time.perf_counter() - start) * 1000, ok=False)
+            return {"error": str(e)}
+        self.stats.record(name, (time.perf_counter() - start) * 1000)
+        return data
+
+    async def get_nasa_apod(self):
+        return await self.request('apod', 'GET', '/api/nasa/apod')
+
+    async def get_pokemon_by_name(self, name):
+        return await self.request('pokemon', 'GET', f'/api/pokemon/{name}')
+
+    async def get_random_pokemon(self):
+        return await self.request('pokemon-random', 'GET', '/api/pokemon/random')
+
+    async def get_horoscope(self, sign):
+        return await self.request('horoscope', 'GET', f'/api/horoscope/{sign}')
+
+    async def get_moon_phase(self):
+        return await self.request('moon-phase', 'GET', '/api/astronomy/moon-phase')
+
+    async def get_iss_location(self):
+        return await self.request('iss-location', 'GET', '/api/astronomy/iss-location')
+
+    async def get_people_in_space(self):
+        return await self.request('people-in-space', 'GET', '/api/astronomy/people-in-space')
+
+    async def get_space_summary(self, sign="aries"):
+        return await self.request('space-summary', 'GET', '/api/space/summary', params={"sign": sign})
+
+    async def batch(self, calls, concurrency=DEFAULT_CONCURRENCY):
+        """Aguarda `calls` (funções que retornam corrotinas) com no máximo `concurrency` ao mesmo tempo"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(call):
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(*(run(call) for call in calls))
+
+    async def get_pokemon_batch(self, names, concurrency=DEFAULT_CONCURRENCY):
+        return await self.batch([lambda name=name: self.get_pokemon_by_name(name) for name in names], concurrency)
+
+
+# --- Funções de módulo (compatibilidade) ---
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def default_client():
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = PikachuClient()
+        return _default_client
+
 
-# --- NASA APOD API ---
 def get_nasa_apod():
-    url = "http://localhost:5000/api/nasa/apod"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
-
-# --- PokeAPI ---
+    return default_client().get_nasa_apod()
+
 def get_pokemon_by_name(name):
-    url = f"http://localhost:5000/api/pokemon/{name}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
+    return default_client().get_pokemon_by_name(name)
 
 def get_random_pokemon():
-    url = "http://localhost:5000/api/pokemon/random"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
-
-# --- Horoscope API ---
+    return default_client().get_random_pokemon()
+
 def get_horoscope(sign):
-    url = f"http://localhost:5000/api/horoscope/{sign}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
-
-# --- Astronomy APIs ---
+    return default_client().get_horoscope(sign)
+
 def get_moon_phase():
-    url = "http://localhost:5000/api/astronomy/moon-phase"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
+    return default_client().get_moon_phase()
 
 def get_iss_location():
-    url = "http://localhost:5000/api/astronomy/iss-location"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
+    return default_client().get_iss_location()
 
 def get_people_in_space():
-    url = "http://localhost:5000/api/astronomy/people-in-space"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
-
+    return default_client().get_people_in_space()
 
-if __name__ == "__main__":
-    print("\n--- Testando NASA APOD ---")
-    apod_data = get_nasa_apod()
-    print(json.dumps(apod_data, indent=2, ensure_ascii=False))
+def get_space_summary(sign="aries"):
+    """APOD, ISS, pessoas no espaço, fase da lua e horóscopo em uma só chamada"""
+    return default_client().get_space_summary(sign)
 
-    print("\n--- Testando Pokémon por nome (pikachu) ---")
-    pikachu_data = get_pokemon_by_name("pikachu")
-    print(json.dumps(pikachu_data, indent=2, ensure_ascii=False))
 
-    print("\n--- Testando Pokémon Aleatório ---")
-    random_pokemon_data = get_random_pokemon()
-    print(json.dumps(random_pokemon_data, indent=2, ensure_ascii=False))
+def parse_args():
+    parser = argparse.ArgumentParser(description='Smoke test da API Pikachu')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--pokemon', nargs='+', default=['pikachu', 'bulbasaur', 'charmander', 'squirtle', 'eevee'])
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    return parser.parse_args()
 
-    print("\n--- Testando Horóscopo (aries) ---")
-    horoscope_data = get_horoscope("aries")
-    print(json.dumps(horoscope_data, indent=2, ensure_ascii=False))
 
-    print("\n--- Testando Fase da Lua ---")
-    moon_phase_data = get_moon_phase()
-    print(json.dumps(moon_phase_data, indent=2, ensure_ascii=False))
+if __name__ == "__main__":
+    args = parse_args()
 
-    print("\n--- Testando Localização da ISS ---")
-    iss_location_data = get_iss_location()
-    print(json.dumps(iss_location_data, indent=2, ensure_ascii=False))
+    with PikachuClient(args.base_url, pool_size=args.concurrency) as client:
+        print(f"\n--- Testando Pokémon em lote ({', '.join(args.pokemon)}) ---")
+        for pokemon_data in client.get_pokemon_batch(args.pokemon, args.concurrency):
+            print(json.dumps(pokemon_data, ensure_ascii=False))
 
-    print("\n--- Testando Pessoas no Espaço ---")
-    people_in_space_data = get_people_in_space()
-    print(json.dumps(people_in_space_data, indent=2, ensure_ascii=False))
+        print("\n--- Testando Pokémon Aleatório ---")
+        random_pokemon_data = client.get_random_pokemon()
+        print(json.dumps(random_pokemon_data, indent=2, ensure_ascii=False))
 
+        # As fontes astronômicas vêm juntas: o servidor as busca em paralelo
+        print("\n--- Testando Resumo Espacial (APOD, ISS, pessoas, lua, horóscopo) ---")
+        summary_data = client.get_space_summary("aries")
+        print(json.dumps(summary_data, indent=2, ensure_ascii=False))
 
+        print("\n--- Latência por endpoint (ms) ---")
+        print(json.dumps(client.stats.summary(), indent=2))
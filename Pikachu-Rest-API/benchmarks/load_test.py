@@ -0,0 +1,258 @@
+"""
+Teste de carga da API Pikachu e do `/api/tasks` do backend TodoApp.
+
+Cada app sobe num servidor WSGI com threads em um processo filho (o gerador
+de carga não disputa o GIL com o servidor), com um banco SQLite temporário
+(DATABASE_URL). As APIs externas são trocadas por um
+adapter do requests montado na sessão compartilhada de
+`shared/http_client.py`, que responde com dados sintéticos após
+`--upstream-latency` ms. Vários threads disparam a mistura de rotas pelo
+tempo pedido; ao final saem p50/p95/p99 e req/s por rota, e opcionalmente
+um JSON para comparar builds.
+
+Uso:
+    python benchmarks/load_test.py --duration 10 --concurrency 16
+    python benchmarks/load_test.py --mix users-list=5,pokemon=3,tasks-list=2 --json resultados.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TODO_BACKEND = os.path.join(os.path.dirname(ROOT), 'api', 'src', 'backend')
+sys.path.insert(0, ROOT)
+
+import requests
+from requests.adapters import BaseAdapter
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from api_client import LatencyStats
+
+POKEMON_NAMES = ['pikachu', 'bulbasaur', 'charmander', 'squirtle', 'eevee', 'snorlax', 'mewtwo', 'gengar']
+EXAMPLE_MARKDOWN = "# Benchmark\n\n## Slide 1\n\n- item 1\n- item 2\n\n## Slide 2\n\n```python\nprint('oi')\n```\n"
+
+sequence = itertools.count(1)
+
+# nome -> (app, método, caminho, corpo, peso padrão)
+ROUTES = {
+    'users-list': ('pikachu', 'GET', lambda: '/api/users', None, 4),
+    'users-create': ('pikachu', 'POST', lambda: '/api/users', lambda: unique_user(), 1),
+    'pokemon': ('pikachu', 'GET', lambda: f'/api/pokemon/{random.choice(POKEMON_NAMES)}', None, 4),
+    'pokemon-random': ('pikachu', 'GET', lambda: '/api/pokemon/random', None, 2),
+    'presentations-convert': ('pikachu', 'POST', lambda: '/api/presentations/convert', lambda: unique_deck(), 1),
+    'presentations-cached': ('pikachu', 'POST', lambda: '/api/presentations/convert',
+                             lambda: {'markdown': EXAMPLE_MARKDOWN, 'title': 'Benchmark'}, 1),
+    'tasks-list': ('todo', 'GET', lambda: '/api/tasks', None, 4),
+    'tasks-create': ('todo', 'POST', lambda: '/api/tasks',
+                     lambda: {'title': f'tarefa {next(sequence)}', 'category_id': 1}, 1),
+}
+
+
+def unique_user():
+    n = next(sequence)
+    return {'username': f'bench{n}', 'email': f'bench{n}@example.com'}
+
+
+def unique_deck():
+    """Deck diferente a cada pedido: mede a renderização, não o cache de PDFs"""
+    return {'markdown': f"{EXAMPLE_MARKDOWN}\nexecução {next(sequence)}\n", 'title': 'Benchmark'}
+
+
+class StubUpstreamAdapter(BaseAdapter):
+    """Responde a qualquer API externa com JSON sintético, sem sair da máquina"""
+
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(self.payload(request.url)).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def payload(self, url):
+        match = re.search(r'/pokemon/([^/?]+)', url)
+        if match:
+            key = match.group(1).lower()
+            if key.isdigit():
+                pokemon_id, name = int(key), f'pokemon-{key}'
+            else:
+                pokemon_id = POKEMON_NAMES.index(key) + 1 if key in POKEMON_NAMES else 9999
+                name = key
+            return {
+                'id': pokemon_id,
+                'name': name,
+                'height': 4, 'weight': 60,
+                'types': [{'type': {'name': 'electric'}}],
+                'abilities': [{'ability': {'name': 'static'}}],
+                'sprites': {'front_default': None},
+            }
+        return {'stub': True, 'url': url}
+
+    def close(self):
+        pass
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def create_pikachu(tmpdir, upstream_latency):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'pikachu.db')}"
+    from src.app import create_app
+    from shared.http_client import http_client
+
+    adapter = StubUpstreamAdapter(upstream_latency)
+    http_client.session.mount('http://', adapter)
+    http_client.session.mount('https://', adapter)
+    return create_app()
+
+
+def create_todo(tmpdir, upstream_latency):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'todo.db')}"
+    sys.path.insert(0, TODO_BACKEND)
+    from main import create_app
+    return create_app({'POMODORO_FLUSH_INTERVAL': 0})
+
+
+APP_FACTORIES = {'pikachu': create_pikachu, 'todo': create_todo}
+
+
+def run_server(name, tmpdir, upstream_latency, conn):
+    """Processo filho: monta o app, informa a porta e atende até ser encerrado"""
+    try:
+        app = APP_FACTORIES[name](tmpdir, upstream_latency)
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    except Exception as e:
+        conn.send(('error', f'{type(e).__name__}: {e}'))
+        raise
+    conn.send(('ok', f'http://127.0.0.1:{server.server_port}'))
+    server.serve_forever()
+
+
+def start_server(name, tmpdir, upstream_latency):
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=run_server, args=(name, tmpdir, upstream_latency, child_conn),
+                                      daemon=True)
+    process.start()
+    status, value = parent_conn.recv()
+    if status != 'ok':
+        process.join()
+        raise SystemExit(f"não foi possível subir o app {name}: {value}")
+    return process, value
+
+
+def worker(bases, mix, stop_at, warmup_until, stats):
+    session = requests.Session()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.monotonic() < stop_at:
+        name = random.choices(names, weights)[0]
+        app, method, path, body, _ = ROUTES[name]
+        start = time.perf_counter()
+        try:
+            response = session.request(method, bases[app] + path(), json=body() if body else None, timeout=30)
+            ok = response.status_code < 400
+        except requests.exceptions.RequestException:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if time.monotonic() >= warmup_until:
+            stats.record(name, elapsed_ms, ok)
+    session.close()
+
+
+def parse_mix(value):
+    if not value:
+        return {name: route[4] for name, route in ROUTES.items()}
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ROUTES:
+            raise SystemExit(f"rota desconhecida: {name} (use {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--duration', type=float, default=10.0, help='segundos de medição')
+    parser.add_argument('--warmup', type=float, default=1.0, help='segundos iniciais descartados')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mix', help="pesos por rota, ex.: users-list=4,pokemon=2 (padrão: todas)")
+    parser.add_argument('--upstream-latency', type=float, default=20.0, help='ms de latência das APIs externas stub')
+    parser.add_argument('--json', help='grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    apps = {ROUTES[name][0] for name in mix}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Orçamento de chamadas, caches e jobs em disco isolados do ambiente real
+        os.environ['RATE_BUDGET_PATH'] = os.path.join(tmpdir, 'rate_budget.db')
+        os.environ['PDF_CACHE_DIR'] = os.path.join(tmpdir, 'pdf_cache')
+        os.environ['PDF_JOB_DIR'] = os.path.join(tmpdir, 'pdf_jobs')
+        os.environ.pop('POKEMON_CACHE_PATH', None)
+
+        processes, bases = [], {}
+        for name in sorted(apps):
+            process, bases[name] = start_server(name, tmpdir, args.upstream_latency / 1000)
+            processes.append(process)
+
+        stats = LatencyStats()
+        warmup_until = time.monotonic() + args.warmup
+        stop_at = warmup_until + args.duration
+        threads = [
+            threading.Thread(target=worker, args=(bases, mix, stop_at, warmup_until, stats))
+            for _ in range(args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    routes = stats.summary()
+    for summary in routes.values():
+        summary['rps'] = round(summary['count'] / args.duration, 1)
+    total = sum(summary['count'] for summary in routes.values())
+
+    print(f"{'rota':<24}{'req':>8}{'erros':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name in sorted(routes):
+        r = routes[name]
+        print(f"{name:<24}{r['count']:>8}{r['errors']:>7}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+    print(f"{'total':<24}{total:>8}{'':>7}{round(total / args.duration, 1):>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'config': {
+                    'duration': args.duration,
+                    'concurrency': args.concurrency,
+                    'upstream_latency_ms': args.upstream_latency,
+                    'mix': mix,
+                },
+                'routes': routes,
+                'total_rps': round(total / args.duration, 1),
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de renderização de apresentações: frio x sem reaproveitamento x aquecido.
+
+- cold: cada render num processo Python novo (import do WeasyPrint, parse do
+  tema e carga de fontes inclusos), como o primeiro job de um worker recém-criado;
+- fresh: no mesmo processo, mas com um `PresentationRenderer` novo por render
+  (conversor Markdown, `FontConfiguration` e `CSS` refeitos, como antes);
+- warm: `warm_up()` uma vez e todos os renders no renderer do processo.
+
+Uso:
+    python benchmarks/pdf_render.py --iterations 20 --slides 10 --theme corporate
+    python benchmarks/pdf_render.py --markdown deck.md --json render.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_client import LatencyStats
+
+SLIDE = """## Slide {n}
+
+Texto do slide {n} com **negrito**, *itálico* e `código`.
+
+- item um
+- item dois
+- item três
+
+```python
+def slide_{n}():
+    return {n}
+```
+"""
+
+COLD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from src.services.pdf_renderer import render_pdf
+imported = time.perf_counter()
+render_pdf(sys.stdin.read(), 'Benchmark', sys.argv[1], footer='')
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'render_ms': (done - imported) * 1000}))
+"""
+
+
+def sample_markdown(slides):
+    return '# Benchmark\n\n' + '\n'.join(SLIDE.format(n=n) for n in range(1, slides + 1))
+
+
+def run_cold(stats, markdown_content, theme, iterations):
+    for _ in range(iterations):
+        result = subprocess.run(
+            [sys.executable, '-c', COLD_SCRIPT, theme], input=markdown_content, capture_output=True,
+            text=True, cwd=ROOT, check=True,
+        )
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        stats.record('cold', timings['import_ms'] + timings['render_ms'])
+        stats.record('cold-render-only', timings['render_ms'])
+
+
+def run_in_process(stats, markdown_content, theme, iterations):
+    from src.services.pdf_renderer import PresentationRenderer, render_pdf, warm_up
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        PresentationRenderer().render_pdf(markdown_content, 'Benchmark', theme, footer='')
+        stats.record('fresh', (time.perf_counter() - start) * 1000)
+
+    warm_up()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_pdf(markdown_content, 'Benchmark', theme, footer='')
+        stats.record('warm', (time.perf_counter() - start) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--slides', type=int, default=8, help='slides do deck sintético')
+    parser.add_argument('--markdown', help='arquivo .md a renderizar no lugar do deck sintético')
+    parser.add_argument('--theme', default='default')
+    parser.add_argument('--cold-iterations', type=int, default=3, help='processos novos (lentos) no modo cold')
+    parser.add_argument('--json', help='grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    if args.markdown:
+        with open(args.markdown, encoding='utf-8') as f:
+            markdown_content = f.read()
+    else:
+        markdown_content = sample_markdown(args.slides)
+
+    stats = LatencyStats()
+    run_cold(stats, markdown_content, args.theme, args.cold_iterations)
+    run_in_process(stats, markdown_content, args.theme, args.iterations)
+    results = stats.summary()
+
+    print(f"{'modo':<20}{'n':>5}{'média ms':>11}{'p50 ms':>9}{'p95 ms':>9}")
+    for name in ('cold', 'cold-render-only', 'fresh', 'warm'):
+        r = results[name]
+        print(f"{name:<20}{r['count']:>5}{r['mean_ms']:>11}{r['p50_ms']:>9}{r['p95_ms']:>9}")
+    if results['warm']['mean_ms']:
+        print(f"\nwarm é {results['fresh']['mean_ms'] / results['warm']['mean_ms']:.1f}x mais rápido que fresh")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'config': {
+                    'iterations': args.iterations,
+                    'cold_iterations': args.cold_iterations,
+                    'theme': args.theme,
+                    'markdown_chars': len(markdown_content),
+                },
+                'modes': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
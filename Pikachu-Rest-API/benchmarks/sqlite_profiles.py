@@ -0,0 +1,140 @@
+"""
+Benchmark de leitura/escrita concorrente no SQLite para cada perfil de
+`src/utils/db_config.py`.
+
+Cada perfil roda sobre um banco temporário próprio: threads leitores fazem
+consultas paginadas enquanto threads escritores inserem uma linha por
+transação. Ao final são comparados leituras/s, escritas/s e quantas
+operações falharam com "database is locked".
+
+Uso:
+    python benchmarks/sqlite_profiles.py --readers 8 --writers 2 --duration 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import src  # noqa: F401 (põe o pacote shared no sys.path)
+from shared.db_config import PROFILES, engine_options, get_profile, install_pragmas
+
+SEED_ROWS = 20000
+
+
+def prepare(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        ))
+        conn.execute(
+            text("INSERT INTO item (payload, created_at) VALUES (:payload, :created_at)"),
+            [{"payload": "x" * 200, "created_at": time.time()} for _ in range(SEED_ROWS)],
+        )
+
+
+def reader(engine, stop_at, counters, lock):
+    reads = errors = 0
+    while time.monotonic() < stop_at:
+        try:
+            with engine.connect() as conn:
+                start = random.randint(1, SEED_ROWS)
+                conn.execute(
+                    text("SELECT id, payload FROM item WHERE id > :start ORDER BY id LIMIT 50"),
+                    {"start": start},
+                ).fetchall()
+            reads += 1
+        except OperationalError:
+            errors += 1
+    with lock:
+        counters['reads'] += reads
+        counters['read_errors'] += errors
+
+
+def writer(engine, stop_at, counters, lock):
+    writes = errors = 0
+    while time.monotonic() < stop_at:
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO item (payload, created_at) VALUES (:payload, :created_at)"),
+                    {"payload": "y" * 200, "created_at": time.time()},
+                )
+            writes += 1
+        except OperationalError:
+            errors += 1
+    with lock:
+        counters['writes'] += writes
+        counters['write_errors'] += errors
+
+
+def run_profile(name, readers, writers, duration):
+    _, profile = get_profile(name)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        uri = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        options = engine_options(uri, profile)
+        # Uma conexão por thread, sem esperar pelo pool
+        options['pool_size'] = readers + writers
+        engine = create_engine(uri, **options)
+        install_pragmas(engine, profile['pragmas'])
+        prepare(engine)
+
+        counters = {'reads': 0, 'writes': 0, 'read_errors': 0, 'write_errors': 0}
+        lock = threading.Lock()
+        stop_at = time.monotonic() + duration
+        threads = [threading.Thread(target=reader, args=(engine, stop_at, counters, lock)) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(engine, stop_at, counters, lock)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        'profile': name,
+        'reads_per_sec': round(counters['reads'] / duration, 1),
+        'writes_per_sec': round(counters['writes'] / duration, 1),
+        'read_errors': counters['read_errors'],
+        'write_errors': counters['write_errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=5.0, help='segundos por perfil')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--json', help='grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    results = [run_profile(name, args.readers, args.writers, args.duration) for name in args.profiles]
+
+    print(f"{'perfil':<14}{'leituras/s':>12}{'escritas/s':>12}{'erros leit.':>13}{'erros escr.':>13}")
+    for r in results:
+        print(f"{r['profile']:<14}{r['reads_per_sec']:>12}{r['writes_per_sec']:>12}"
+              f"{r['read_errors']:>13}{r['write_errors']:>13}")
+
+    by_name = {r['profile']: r for r in results}
+    if 'development' in by_name and 'production' in by_name:
+        base, tuned = by_name['development'], by_name['production']
+        for key in ('reads_per_sec', 'writes_per_sec'):
+            if base[key]:
+                print(f"{key}: {tuned[key] / base[key]:.2f}x em production")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
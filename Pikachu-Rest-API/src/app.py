@@ -3,9 +3,11 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
-from src.models.user import db
+from src.models import db
+from shared.static_files import StaticManifest
+from shared.db_config import configure_database, init_database
 
 class PikachuWebServer:
     def __init__(self):
@@ -17,7 +19,8 @@ class PikachuWebServer:
     def configure_app(self):
         """Configura as configurações básicas da aplicação Flask"""
         self.app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+        # Banco SQLite com perfil de PRAGMAs/pool escolhido por DB_PROFILE
+        configure_database(self.app, os.path.join(os.path.dirname(__file__), 'database', 'app.db'))
         self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
         
         # Habilita CORS para todas as rotas
@@ -26,8 +29,11 @@ class PikachuWebServer:
     def setup_database(self):
         """Configura e inicializa o banco de dados"""
         db.init_app(self.app)
+        init_database(self.app, db)
         with self.app.app_context():
             db.create_all()
+            # Nenhuma conexão aberta pode ser herdada pelos workers após o fork
+            db.engine.dispose()
     
     def setup_routes(self):
         """Configura todas as rotas da aplicação"""
@@ -40,30 +46,32 @@ class PikachuWebServer:
         self.app.register_blueprint(astro_bp, url_prefix='/api')
         self.app.register_blueprint(presentations_bp, url_prefix='/api')
         
-        # Rota para servir arquivos estáticos
+        # Rota para servir arquivos estáticos (manifesto em memória, com
+        # variantes gzip/brotli e cache longo para arquivos com hash no nome)
+        static_manifest = StaticManifest(self.app.static_folder)
+
         @self.app.route('/', defaults={'path': ''})
         @self.app.route('/<path:path>')
         def serve(path):
-            static_folder_path = self.app.static_folder
-            if static_folder_path is None:
+            if self.app.static_folder is None:
                 return "Static folder not configured", 404
 
-            if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-                return send_from_directory(static_folder_path, path)
-            else:
-                index_path = os.path.join(static_folder_path, 'index.html')
-                if os.path.exists(index_path):
-                    return send_from_directory(static_folder_path, 'index.html')
-                else:
-                    return "index.html not found", 404
+            response = static_manifest.serve(path)
+            if response is None:
+                return "index.html not found", 404
+            return response
     
-    def run(self, host='0.0.0.0', port=5000, debug=True):
-        """Executa a aplicação Flask"""
+    def run(self, host='0.0.0.0', port=5000, debug=None):
+        """Executa o servidor de desenvolvimento (em produção use src/serve.py)"""
+        if debug is None:
+            debug = os.environ.get('FLASK_DEBUG') == '1'
         self.app.run(host=host, port=port, debug=debug)
 
-# Instância global da aplicação
-server = PikachuWebServer()
+def create_app():
+    """Application factory usada pelo servidor de produção"""
+    return PikachuWebServer().app
 
 if __name__ == '__main__':
+    server = PikachuWebServer()
     server.run()
 
@@ -0,0 +1,41 @@
+"""
+App ASGI: rotas assíncronas de astronomia na frente do app Flask.
+
+As rotas de `routes/astro_async.py` respondem direto no event loop; todo o
+resto (usuários, apresentações, métricas, SPA) cai no app Flask, servido
+pelo pool de threads do WSGIMiddleware.
+
+Uso (na pasta Pikachu-Rest-API):
+    uvicorn --factory src.asgi:create_app --workers 4 --port 5000
+"""
+
+import os
+import sys
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from src.app import create_app as create_flask_app
+from src.routes.astro_async import astro_async_routes
+from src.services.async_http_client import async_http_client
+
+WSGI_THREADS = int(os.environ.get('WSGI_THREADS', 10))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await async_http_client.open()
+    yield
+    await async_http_client.close()
+
+
+def create_app(flask_app=None):
+    """Starlette com as rotas assíncronas e o Flask montado como fallback"""
+    flask_app = flask_app or create_flask_app()
+    routes = astro_async_routes() + [Mount('/', app=WSGIMiddleware(flask_app, workers=WSGI_THREADS))]
+    return Starlette(routes=routes, lifespan=lifespan)
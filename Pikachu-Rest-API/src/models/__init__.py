@@ -0,0 +1,6 @@
+"""Modelos do app: importar o pacote registra todas as tabelas no `db` (para o create_all)"""
+
+from src.models.user import User, db
+from src.models.table_version import TableVersion
+
+__all__ = ['db', 'User', 'TableVersion']
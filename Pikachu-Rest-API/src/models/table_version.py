@@ -0,0 +1,46 @@
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.models.user import db
+
+
+class TableVersion(db.Model):
+    """Contador de alterações por tabela, usado para gerar ETags baratos"""
+    __tablename__ = 'table_version'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TableVersion {self.table_name}={self.version}>'
+
+
+def get_table_version(table_name):
+    """Versão atual da tabela (0 se ela nunca foi alterada)"""
+    version = db.session.scalar(
+        select(TableVersion.version).where(TableVersion.table_name == table_name)
+    )
+    return version or 0
+
+
+@event.listens_for(Session, 'after_flush')
+def bump_table_versions(session, flush_context):
+    """Incrementa, na mesma transação, a versão de cada tabela alterada no flush"""
+    # O listener vale para toda Session do processo; só conta os modelos deste db
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, db.Model) and not isinstance(obj, TableVersion)
+    }
+    if not tables:
+        return
+
+    connection = session.connection()
+    for table_name in sorted(tables):
+        stmt = insert(TableVersion.__table__).values(table_name=table_name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['table_name'],
+            set_={'version': TableVersion.__table__.c.version + 1},
+        )
+        connection.execute(stmt)
@@ -1,46 +1,125 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 import requests
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import math
 import os
+import time
+
+from shared.circuit_breaker import CircuitOpenError
+from shared.http_client import http_client
+from shared.pokemon_cache import PokemonCache, pokemon_cache
+from shared.rate_budget import RateBudgetExceeded
+from shared.response_cache import DAY, HOUR, response_cache
 
 astro_bp = Blueprint('astro', __name__)
 
 # NASA API Key - você pode obter uma em https://api.nasa.gov/
 NASA_API_KEY = os.environ.get('NASA_API_KEY', 'DEMO_KEY')
 
+# Janela de cache (segundos) de cada endpoint e por quanto tempo a resposta
+# anterior ainda é servida enquanto a nova é buscada
+ISS_WINDOW = int(os.environ.get('ISS_CACHE_WINDOW', 5))
+CACHE_POLICIES = {
+    'apod': (DAY, HOUR),
+    'horoscope': (DAY, HOUR),
+    'moon-phase': (DAY, HOUR),
+    'people-in-space': (HOUR, HOUR),
+    'iss-location': (ISS_WINDOW, ISS_WINDOW),
+}
+
+# Coordenadas do Rio de Janeiro
+LATITUDE = -22.9068
+LONGITUDE = -43.1729
+
+APOD_URL = "https://api.nasa.gov/planetary/apod"
+POKEAPI_URL = "https://pokeapi.co/api/v2/pokemon"
+# Usando uma API de horóscopo gratuita
+HOROSCOPE_URL = "https://horoscope-app-api.vercel.app/api/v1/get-horoscope/daily"
+MOON_PHASE_URL = "https://api.astronomyapi.com/api/v2/studio/moon-phase"
+MOON_PHASE_FALLBACK_URL = "https://api.farmsense.net/v1/moonphases/"
+ISS_LOCATION_URL = "http://api.open-notify.org/iss-now.json"
+PEOPLE_IN_SPACE_URL = "http://api.open-notify.org/astros.json"
+
+# Prazo (segundos) de cada fonte do /space/summary; quem não responder a
+# tempo volta como "timeout" e a busca termina em segundo plano no cache
+SUMMARY_DEADLINE = float(os.environ.get('SPACE_SUMMARY_DEADLINE', 3.0))
+SUMMARY_DEADLINES = {
+    'apod': SUMMARY_DEADLINE,
+    'iss-location': min(SUMMARY_DEADLINE, 2.0),
+    'people-in-space': SUMMARY_DEADLINE,
+    'moon-phase': SUMMARY_DEADLINE,
+    'horoscope': SUMMARY_DEADLINE,
+}
+summary_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('SPACE_SUMMARY_WORKERS', 16)),
+    thread_name_prefix='space-summary',
+)
+
+def retry_after(e):
+    """Segundos para o Retry-After se a falha for circuito aberto ou orçamento esgotado (também encadeados)"""
+    while e is not None:
+        if isinstance(e, (CircuitOpenError, RateBudgetExceeded)):
+            return max(math.ceil(min(e.retry_after or 1, HOUR)), 1)
+        e = getattr(e, '__cause__', None)
+    return None
+
+def error_response(e):
+    """Upstream indisponível por decisão nossa vira 503 com Retry-After; o resto, 500"""
+    seconds = retry_after(e)
+    if seconds is not None:
+        return jsonify({"error": str(e)}), 503, {'Retry-After': str(seconds)}
+    return jsonify({"error": str(e)}), 500
+
+def cached(name, fetch, key=None):
+    """Resposta de `fetch` pelo cache de janela de tempo do endpoint `name`"""
+    window, stale_for = CACHE_POLICIES[name]
+    return response_cache.get_or_fetch(key or name, fetch, window, stale_for)
+
+def fetch_apod():
+    response = http_client.get(APOD_URL, params={"api_key": NASA_API_KEY})
+    response.raise_for_status()
+    return response.json()
+
 @astro_bp.route('/nasa/apod', methods=['GET'])
 def get_nasa_apod():
     """Obtém a Foto Astronômica do Dia da NASA"""
     try:
-        url = f"https://api.nasa.gov/planetary/apod?api_key={NASA_API_KEY}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached('apod', fetch_apod))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def simplify_pokemon(data):
+    """Reduz a resposta da PokeAPI aos campos usados pelo frontend"""
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "height": data["height"],
+        "weight": data["weight"],
+        "types": [type_info["type"]["name"] for type_info in data["types"]],
+        "abilities": [ability["ability"]["name"] for ability in data["abilities"]],
+        "sprite": data["sprites"]["front_default"]
+    }
+
+def fetch_pokemon(identifier):
+    """Busca um Pokémon por nome ou ID, passando primeiro pelo cache"""
+    hit = pokemon_cache.get(identifier)
+    if hit is not None:
+        return hit
+    url = f"{POKEAPI_URL}/{PokemonCache.normalize(identifier)}"
+    response = http_client.get(url)
+    response.raise_for_status()
+    simplified_data = simplify_pokemon(response.json())
+    pokemon_cache.put(simplified_data)
+    return simplified_data
 
 @astro_bp.route('/pokemon/<pokemon_name>', methods=['GET'])
 def get_pokemon(pokemon_name):
     """Obtém informações de um Pokémon específico"""
     try:
-        url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Simplificando os dados retornados
-        simplified_data = {
-            "id": data["id"],
-            "name": data["name"],
-            "height": data["height"],
-            "weight": data["weight"],
-            "types": [type_info["type"]["name"] for type_info in data["types"]],
-            "abilities": [ability["ability"]["name"] for ability in data["abilities"]],
-            "sprite": data["sprites"]["front_default"]
-        }
-        return jsonify(simplified_data)
+        return jsonify(fetch_pokemon(pokemon_name))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @astro_bp.route('/pokemon/random', methods=['GET'])
 def get_random_pokemon():
@@ -48,128 +127,203 @@ def get_random_pokemon():
     try:
         import random
         pokemon_id = random.randint(1, 1010)  # Existem cerca de 1010 Pokémon
-        url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        simplified_data = {
-            "id": data["id"],
-            "name": data["name"],
-            "height": data["height"],
-            "weight": data["weight"],
-            "types": [type_info["type"]["name"] for type_info in data["types"]],
-            "abilities": [ability["ability"]["name"] for ability in data["abilities"]],
-            "sprite": data["sprites"]["front_default"]
-        }
-        return jsonify(simplified_data)
+        return jsonify(fetch_pokemon(pokemon_id))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_horoscope(sign):
+    response = http_client.get(HOROSCOPE_URL, params={"sign": sign, "day": "today"})
+    response.raise_for_status()
+    return response.json()
+
+def cached_horoscope(sign):
+    sign = sign.lower()
+    return cached('horoscope', lambda: fetch_horoscope(sign), key=f'horoscope:{sign}')
 
 @astro_bp.route('/horoscope/<sign>', methods=['GET'])
 def get_horoscope(sign):
     """Obtém o horóscopo do dia para um signo específico"""
     try:
-        # Usando uma API de horóscopo gratuita
-        url = f"https://horoscope-app-api.vercel.app/api/v1/get-horoscope/daily?sign={sign}&day=today"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached_horoscope(sign))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def moon_phase_request():
+    """(url, payload, headers, data) da chamada à Astronomy API para hoje"""
+    current_date = datetime.now().strftime('%Y-%m-%d')
+
+    # Dados para a requisição
+    payload = {
+        "format": "png",
+        "style": {
+            "moonStyle": "default",
+            "backgroundStyle": "stars",
+            "backgroundColor": "#000000",
+            "headingColor": "#ffffff",
+            "textColor": "#ffffff"
+        },
+        "observer": {
+            "latitude": LATITUDE,
+            "longitude": LONGITUDE,
+            "date": current_date
+        },
+        "view": {
+            "type": "portrait-simple",
+            "orientation": "south-up"
+        }
+    }
+
+    # Headers com autenticação básica (usando credenciais demo)
+    headers = {
+        "Authorization": "Basic YWRtaW46YWRtaW4=",  # admin:admin em base64 para demo
+        "Content-Type": "application/json"
+    }
+    return MOON_PHASE_URL, payload, headers, current_date
+
+def moon_phase_from_primary(data, current_date):
+    return {
+        "location": "Rio de Janeiro",
+        "date": current_date,
+        "imageUrl": data["data"]["imageUrl"],
+        "latitude": LATITUDE,
+        "longitude": LONGITUDE
+    }
+
+def moon_phase_from_fallback(fallback_data):
+    if not fallback_data:
+        return None
+    latest_phase = fallback_data[0]
+    return {
+        "location": "Rio de Janeiro",
+        "phase": latest_phase["Phase"],
+        "date": latest_phase["Date"],
+        "time": latest_phase["Time"],
+        "source": "fallback"
+    }
+
+def fetch_moon_phase_primary():
+    """Fase da lua pela Astronomy API; None se ela não responder 200"""
+    url, payload, headers, current_date = moon_phase_request()
+    response = http_client.post(url, json=payload, headers=headers)
+    if response.status_code != 200:
+        return None
+    return moon_phase_from_primary(response.json(), current_date)
+
+def fetch_moon_phase_fallback():
+    """Fase da lua pela API alternativa (farmsense); None se vier vazia"""
+    fallback_response = http_client.get(MOON_PHASE_FALLBACK_URL)
+    fallback_response.raise_for_status()
+    return moon_phase_from_fallback(fallback_response.json())
+
+def fetch_moon_phase():
+    # Fallback para API alternativa se a principal falhar: resposta não-200,
+    # erro de rede/timeout, circuito aberto ou orçamento esgotado
+    try:
+        data = fetch_moon_phase_primary()
+    except (requests.exceptions.RequestException, CircuitOpenError, RateBudgetExceeded):
+        data = None
+    return data or fetch_moon_phase_fallback()
 
 @astro_bp.route('/astronomy/moon-phase', methods=['GET'])
 def get_moon_phase():
     """Obtém informações sobre a fase da lua atual usando Astronomy API"""
     try:
-        # Coordenadas do Rio de Janeiro
-        latitude = -22.9068
-        longitude = -43.1729
-        
-        # Data atual
-        from datetime import datetime
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Dados para a requisição
-        payload = {
-            "format": "png",
-            "style": {
-                "moonStyle": "default",
-                "backgroundStyle": "stars",
-                "backgroundColor": "#000000",
-                "headingColor": "#ffffff",
-                "textColor": "#ffffff"
-            },
-            "observer": {
-                "latitude": latitude,
-                "longitude": longitude,
-                "date": current_date
-            },
-            "view": {
-                "type": "portrait-simple",
-                "orientation": "south-up"
-            }
-        }
-        
-        # Headers com autenticação básica (usando credenciais demo)
-        headers = {
-            "Authorization": "Basic YWRtaW46YWRtaW4=",  # admin:admin em base64 para demo
-            "Content-Type": "application/json"
-        }
-        
-        url = "https://api.astronomyapi.com/api/v2/studio/moon-phase"
-        response = requests.post(url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return jsonify({
-                "location": "Rio de Janeiro",
-                "date": current_date,
-                "imageUrl": data["data"]["imageUrl"],
-                "latitude": latitude,
-                "longitude": longitude
-            })
-        else:
-            # Fallback para API alternativa se a principal falhar
-            fallback_url = "https://api.farmsense.net/v1/moonphases/"
-            fallback_response = requests.get(fallback_url)
-            fallback_response.raise_for_status()
-            fallback_data = fallback_response.json()
-            
-            if fallback_data:
-                latest_phase = fallback_data[0]
-                return jsonify({
-                    "location": "Rio de Janeiro",
-                    "phase": latest_phase["Phase"],
-                    "date": latest_phase["Date"],
-                    "time": latest_phase["Time"],
-                    "source": "fallback"
-                })
-            else:
-                return jsonify({"error": "Nenhuma informação de fase lunar encontrada"}), 404
-                
+        data = cached('moon-phase', fetch_moon_phase)
+        if data is None:
+            return jsonify({"error": "Nenhuma informação de fase lunar encontrada"}), 404
+        return jsonify(data)
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_iss_location():
+    response = http_client.get(ISS_LOCATION_URL)
+    response.raise_for_status()
+    return response.json()
 
 @astro_bp.route('/astronomy/iss-location', methods=['GET'])
 def get_iss_location():
     """Obtém a localização atual da Estação Espacial Internacional"""
     try:
-        url = "http://api.open-notify.org/iss-now.json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached('iss-location', fetch_iss_location))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_people_in_space():
+    response = http_client.get(PEOPLE_IN_SPACE_URL)
+    response.raise_for_status()
+    return response.json()
 
 @astro_bp.route('/astronomy/people-in-space', methods=['GET'])
 def get_people_in_space():
     """Obtém informações sobre pessoas atualmente no espaço"""
     try:
-        url = "http://api.open-notify.org/astros.json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached('people-in-space', fetch_people_in_space))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def summary_sources(sign):
+    """Fontes do resumo espacial, cada uma passando pelo cache do seu endpoint"""
+    return {
+        'apod': lambda: cached('apod', fetch_apod),
+        'iss-location': lambda: cached('iss-location', fetch_iss_location),
+        'people-in-space': lambda: cached('people-in-space', fetch_people_in_space),
+        'moon-phase': lambda: cached('moon-phase', fetch_moon_phase),
+        'horoscope': lambda: cached_horoscope(sign),
+    }
+
+def timed(fetch):
+    start = time.monotonic()
+    return fetch(), round((time.monotonic() - start) * 1000, 1)
+
+@astro_bp.route('/space/summary', methods=['GET'])
+def get_space_summary():
+    """Resumo do painel: todas as fontes em paralelo, com prazo e status por fonte"""
+    sign = request.args.get('sign', 'aries')
+    start = time.monotonic()
+    futures = {
+        name: summary_executor.submit(timed, fetch)
+        for name, fetch in summary_sources(sign).items()
+    }
+
+    sources = {}
+    for name, future in futures.items():
+        remaining = start + SUMMARY_DEADLINES[name] - time.monotonic()
+        try:
+            data, elapsed_ms = future.result(timeout=max(remaining, 0))
+        except FutureTimeout:
+            sources[name] = {"status": "timeout", "deadline_ms": SUMMARY_DEADLINES[name] * 1000}
+        except Exception as e:
+            sources[name] = {"status": "error", "error": str(e)}
+        else:
+            sources[name] = {"status": "ok" if data is not None else "empty", "data": data, "elapsed_ms": elapsed_ms}
+
+    return jsonify({
+        "sources": sources,
+        "elapsed_ms": round((time.monotonic() - start) * 1000, 1)
+    })
+
+@astro_bp.route('/health/upstreams', methods=['GET'])
+def get_upstream_health():
+    """Circuit breaker e orçamento de chamadas de cada API externa"""
+    breakers = http_client.breakers.snapshot()
+    metrics = http_client.metrics.snapshot()
+    upstreams = {name: dict(breaker, metrics=metrics.get(name)) for name, breaker in breakers.items()}
+    budgets = http_client.budget.snapshot()
+    for name, budget in budgets.items():
+        upstreams.setdefault(name, {})['budget'] = budget
+    degraded = any(breaker['state'] != 'closed' for breaker in breakers.values())
+    degraded = degraded or any(budget['tokens'] < 1 for budget in budgets.values())
+    return jsonify({"status": "degraded" if degraded else "ok", "upstreams": upstreams})
+
+@astro_bp.route('/metrics/upstreams', methods=['GET'])
+def get_upstream_metrics():
+    """Métricas das chamadas às APIs externas (requisições, erros e latência por host)"""
+    return jsonify(http_client.metrics.snapshot())
 
+@astro_bp.route('/metrics/caches', methods=['GET'])
+def get_cache_metrics():
+    """Estatísticas dos caches de respostas externas"""
+    return jsonify({
+        "pokemon": pokemon_cache.stats(),
+        "responses": response_cache.stats()
+    })
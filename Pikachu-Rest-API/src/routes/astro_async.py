@@ -0,0 +1,201 @@
+"""
+Versão assíncrona (Starlette) das rotas de `astro.py`.
+
+Cada request pendente é só uma corrotina esperando o upstream, então um
+processo segura milhares de chamadas externas em aberto sem ocupar threads.
+As rotas usam as mesmas URLs, políticas de cache e payloads do blueprint
+síncrono; `src/asgi.py` as monta na frente do app Flask.
+
+A fase da lua faz hedge: se a Astronomy API não responder em
+MOON_PHASE_HEDGE_DELAY segundos (ou falhar antes disso), a API alternativa é
+disparada em paralelo e vale a primeira resposta útil.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import httpx
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.routes.astro import (
+    APOD_URL, CACHE_POLICIES, HOROSCOPE_URL, ISS_LOCATION_URL, MOON_PHASE_FALLBACK_URL,
+    NASA_API_KEY, PEOPLE_IN_SPACE_URL, POKEAPI_URL, SUMMARY_DEADLINES, moon_phase_from_fallback,
+    moon_phase_from_primary, moon_phase_request, retry_after, simplify_pokemon,
+)
+from src.services.async_http_client import async_http_client
+from shared.pokemon_cache import PokemonCache, pokemon_cache
+from shared.response_cache import response_cache
+
+MOON_PHASE_HEDGE_DELAY = float(os.environ.get('MOON_PHASE_HEDGE_DELAY', 0.5))
+
+
+def error_response(e, status=500):
+    seconds = retry_after(e) if status == 500 else None
+    if seconds is not None:
+        # Circuito aberto ou orçamento esgotado (`httpx.ConnectError` encadeado)
+        return JSONResponse({"error": str(e)}, status_code=503, headers={'Retry-After': str(seconds)})
+    return JSONResponse({"error": str(e)}, status_code=status)
+
+
+async def cached(name, fetch, key=None):
+    window, stale_for = CACHE_POLICIES[name]
+    return await response_cache.get_or_fetch_async(key or name, fetch, window, stale_for)
+
+
+async def get_json(url, **kwargs):
+    response = await async_http_client.get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_moon_phase_primary():
+    url, payload, headers, current_date = moon_phase_request()
+    response = await async_http_client.post(url, json=payload, headers=headers)
+    if response.status_code != 200:
+        return None
+    return moon_phase_from_primary(response.json(), current_date)
+
+
+async def fetch_moon_phase_fallback():
+    return moon_phase_from_fallback(await get_json(MOON_PHASE_FALLBACK_URL))
+
+
+async def fetch_moon_phase(hedge_delay=None):
+    """Primeira resposta útil entre a API principal e a alternativa"""
+    hedge_delay = MOON_PHASE_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    primary = asyncio.ensure_future(fetch_moon_phase_primary())
+    done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+    if done and not primary.exception() and primary.result() is not None:
+        return primary.result()
+
+    pending = {asyncio.ensure_future(fetch_moon_phase_fallback())}
+    if not done:
+        pending.add(primary)
+    error = primary.exception() if done else None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception():
+                    error = task.exception()
+                elif task.result() is not None:
+                    return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+    if error is not None:
+        raise error
+    return None
+
+
+async def fetch_pokemon(identifier):
+    cached_payload = pokemon_cache.get(identifier)
+    if cached_payload is not None:
+        return cached_payload
+    simplified_data = simplify_pokemon(await get_json(f"{POKEAPI_URL}/{PokemonCache.normalize(identifier)}"))
+    pokemon_cache.put(simplified_data)
+    return simplified_data
+
+
+async def get_nasa_apod(request):
+    try:
+        return JSONResponse(await cached('apod', lambda: get_json(APOD_URL, params={"api_key": NASA_API_KEY})))
+    except httpx.HTTPError as e:
+        return error_response(e)
+
+
+async def get_pokemon(request):
+    try:
+        return JSONResponse(await fetch_pokemon(request.path_params['pokemon_name']))
+    except httpx.HTTPError as e:
+        return error_response(e)
+
+
+async def get_random_pokemon(request):
+    try:
+        return JSONResponse(await fetch_pokemon(random.randint(1, 1010)))
+    except httpx.HTTPError as e:
+        return error_response(e)
+
+
+async def cached_horoscope(sign):
+    fetch = lambda: get_json(HOROSCOPE_URL, params={"sign": sign, "day": "today"})
+    return await cached('horoscope', fetch, key=f'horoscope:{sign}')
+
+
+async def get_horoscope(request):
+    sign = request.path_params['sign'].lower()
+    try:
+        return JSONResponse(await cached_horoscope(sign))
+    except httpx.HTTPError as e:
+        return error_response(e)
+
+
+async def get_moon_phase(request):
+    try:
+        data = await cached('moon-phase', fetch_moon_phase)
+    except httpx.HTTPError as e:
+        return error_response(e)
+    if data is None:
+        return error_response("Nenhuma informação de fase lunar encontrada", 404)
+    return JSONResponse(data)
+
+
+async def get_iss_location(request):
+    try:
+        return JSONResponse(await cached('iss-location', lambda: get_json(ISS_LOCATION_URL)))
+    except httpx.HTTPError as e:
+        return error_response(e)
+
+
+async def get_people_in_space(request):
+    try:
+        return JSONResponse(await cached('people-in-space', lambda: get_json(PEOPLE_IN_SPACE_URL)))
+    except httpx.HTTPError as e:
+        return error_response(e)
+
+
+async def fetch_summary_source(name, fetch):
+    start = time.monotonic()
+    try:
+        data = await asyncio.wait_for(fetch(), timeout=SUMMARY_DEADLINES[name])
+    except asyncio.TimeoutError:
+        return {"status": "timeout", "deadline_ms": SUMMARY_DEADLINES[name] * 1000}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+    return {"status": "ok" if data is not None else "empty", "data": data, "elapsed_ms": elapsed_ms}
+
+
+async def get_space_summary(request):
+    sign = request.query_params.get('sign', 'aries').lower()
+    sources = {
+        'apod': lambda: cached('apod', lambda: get_json(APOD_URL, params={"api_key": NASA_API_KEY})),
+        'iss-location': lambda: cached('iss-location', lambda: get_json(ISS_LOCATION_URL)),
+        'people-in-space': lambda: cached('people-in-space', lambda: get_json(PEOPLE_IN_SPACE_URL)),
+        'moon-phase': lambda: cached('moon-phase', fetch_moon_phase),
+        'horoscope': lambda: cached_horoscope(sign),
+    }
+    start = time.monotonic()
+    results = await asyncio.gather(*(fetch_summary_source(name, fetch) for name, fetch in sources.items()))
+    return JSONResponse({
+        "sources": dict(zip(sources, results)),
+        "elapsed_ms": round((time.monotonic() - start) * 1000, 1)
+    })
+
+
+def astro_async_routes(prefix='/api'):
+    """Rotas com os mesmos caminhos do astro_bp (registrado em /api)"""
+    return [
+        Route(f'{prefix}/nasa/apod', get_nasa_apod),
+        Route(f'{prefix}/pokemon/random', get_random_pokemon),
+        Route(f'{prefix}/pokemon/{{pokemon_name}}', get_pokemon),
+        Route(f'{prefix}/horoscope/{{sign}}', get_horoscope),
+        Route(f'{prefix}/astronomy/moon-phase', get_moon_phase),
+        Route(f'{prefix}/astronomy/iss-location', get_iss_location),
+        Route(f'{prefix}/astronomy/people-in-space', get_people_in_space),
+        Route(f'{prefix}/space/summary', get_space_summary),
+    ]
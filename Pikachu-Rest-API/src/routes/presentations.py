@@ -1,16 +1,76 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file
 import os
-import tempfile
-import markdown
-from weasyprint import HTML, CSS
-from datetime import datetime
+import re
 import base64
+from datetime import datetime
+from urllib.parse import quote
+from src.services.pdf_renderer import THEMES, footer_text, pdf_filename, resolve_theme, warm_up
+from src.services.pdf_cache import pdf_cache
+from src.services.pdf_jobs import QueueFull, pdf_jobs
+from src.services.pdf_batch import MAX_DOCUMENTS, batch_zip
+from src.services.slide_deck import render_deck
 
 presentations_bp = Blueprint('presentations', __name__)
 
+if os.environ.get('PDF_WARM_UP', '1') == '1':
+    # Fontes e temas carregados na inicialização, não na primeira conversão
+    presentations_bp.record_once(lambda state: warm_up())
+
+# Acima disso (ou com "async": true) a conversão vira job na fila de renderização
+SYNC_MAX_CHARS = int(os.environ.get('PDF_SYNC_MAX_CHARS', 20000))
+# Tempo máximo que o long-poll segura a requisição
+MAX_POLL_WAIT = float(os.environ.get('PDF_JOB_MAX_WAIT', 25))
+JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def wants_pdf():
+    """Accept: application/pdf pede o PDF binário; JSON/base64 continua o padrão"""
+    return request.accept_mimetypes.best_match(['application/json', 'application/pdf']) == 'application/pdf'
+
+
+def attachment(filename):
+    return {'Content-Disposition': f"attachment; filename*=UTF-8''{quote(filename)}"}
+
+
+def pdf_response(pdf_content, filename, cache_key=None, cache_status=None):
+    """PDF binário ou JSON/base64; com `cache_key`, ETag forte por representação"""
+    binary = wants_pdf()
+    if binary:
+        response = Response(pdf_content, mimetype='application/pdf', headers=attachment(filename))
+    else:
+        response = jsonify({
+            "success": True,
+            "pdf_base64": base64.b64encode(pdf_content).decode('utf-8'),
+            "filename": filename,
+            "size": len(pdf_content)
+        })
+    response.vary.add('Accept')
+    if cache_key:
+        response.set_etag(cache_key if binary else f'{cache_key}-base64')
+    if cache_status:
+        response.headers['X-Cache'] = cache_status
+    return response.make_conditional(request)
+
+
+def request_footer(data):
+    """Texto do rodapé a partir de `footer` (datetime/date/none) e `generated_at` (ISO 8601)"""
+    generated_at = data.get('generated_at')
+    if generated_at is not None:
+        generated_at = datetime.fromisoformat(str(generated_at))
+    return footer_text(data.get('footer', 'datetime'), generated_at)
+
+
+def job_json(state):
+    job_id = state['job_id']
+    body = {**state, "status_url": f"/api/presentations/jobs/{job_id}"}
+    if state['status'] == 'done':
+        body["result_url"] = f"/api/presentations/jobs/{job_id}/result"
+    return body
+
+
 @presentations_bp.route('/presentations/convert', methods=['POST'])
 def convert_markdown_to_pdf():
-    """Converte Markdown para PDF de apresentação"""
+    """Converte Markdown para PDF de apresentação (documentos grandes viram job)"""
     try:
         data = request.get_json()
         
@@ -19,172 +79,123 @@ def convert_markdown_to_pdf():
         
         markdown_content = data['markdown']
         title = data.get('title', 'Apresentação')
-        theme = data.get('theme', 'default')
-        
-        # Converte Markdown para HTML
-        md = markdown.Markdown(extensions=['extra', 'codehilite'])
-        html_content = md.convert(markdown_content)
-        
-        # Template HTML para apresentação
-        html_template = f"""
-        <!DOCTYPE html>
-        <html lang="pt-BR">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{title}</title>
-            <style>
-                @page {{
-                    size: A4 landscape;
-                    margin: 2cm;
-                }}
-                
-                body {{
-                    font-family: 'Arial', sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    margin: 0;
-                    padding: 20px;
-                }}
-                
-                .slide {{
-                    background: white;
-                    padding: 40px;
-                    margin-bottom: 30px;
-                    border-radius: 15px;
-                    box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-                    page-break-after: always;
-                    min-height: 500px;
-                }}
-                
-                .slide:last-child {{
-                    page-break-after: avoid;
-                }}
-                
-                h1 {{
-                    color: #667eea;
-                    font-size: 2.5em;
-                    margin-bottom: 20px;
-                    text-align: center;
-                    border-bottom: 3px solid #667eea;
-                    padding-bottom: 10px;
-                }}
-                
-                h2 {{
-                    color: #764ba2;
-                    font-size: 2em;
-                    margin-top: 30px;
-                    margin-bottom: 15px;
-                }}
-                
-                h3 {{
-                    color: #555;
-                    font-size: 1.5em;
-                    margin-top: 25px;
-                    margin-bottom: 10px;
-                }}
-                
-                p {{
-                    font-size: 1.1em;
-                    margin-bottom: 15px;
-                    text-align: justify;
-                }}
-                
-                ul, ol {{
-                    font-size: 1.1em;
-                    margin-left: 20px;
-                }}
-                
-                li {{
-                    margin-bottom: 8px;
-                }}
-                
-                code {{
-                    background: #f4f4f4;
-                    padding: 2px 6px;
-                    border-radius: 3px;
-                    font-family: 'Courier New', monospace;
-                }}
-                
-                pre {{
-                    background: #f8f8f8;
-                    padding: 15px;
-                    border-radius: 5px;
-                    border-left: 4px solid #667eea;
-                    overflow-x: auto;
-                }}
-                
-                blockquote {{
-                    border-left: 4px solid #764ba2;
-                    margin: 20px 0;
-                    padding: 10px 20px;
-                    background: #f9f9f9;
-                    font-style: italic;
-                }}
-                
-                .footer {{
-                    position: fixed;
-                    bottom: 20px;
-                    right: 20px;
-                    font-size: 0.9em;
-                    color: #666;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="slide">
-                {html_content}
-            </div>
-            <div class="footer">
-                Gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')}
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Cria arquivo temporário para o PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            # Converte HTML para PDF
-            HTML(string=html_template).write_pdf(temp_file.name)
-            
-            # Lê o arquivo PDF e converte para base64
-            with open(temp_file.name, 'rb') as pdf_file:
-                pdf_content = pdf_file.read()
-                pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-            
-            # Remove o arquivo temporário
-            os.unlink(temp_file.name)
-            
-            return jsonify({
-                "success": True,
-                "pdf_base64": pdf_base64,
-                "filename": f"{title.replace(' ', '_')}.pdf",
-                "size": len(pdf_content)
-            })
+        theme = resolve_theme(data.get('theme', 'default'))
+        try:
+            footer = request_footer(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        cache_key = pdf_cache.key(markdown_content, title, theme, footer)
+        pdf_content = pdf_cache.get(cache_key)
+        if pdf_content is not None:
+            return pdf_response(pdf_content, pdf_filename(title), cache_key, 'HIT')
+
+        if data.get('async') or len(markdown_content) > SYNC_MAX_CHARS:
+            try:
+                state = pdf_jobs.submit(markdown_content, title, theme, footer, cache_key)
+            except QueueFull as e:
+                return jsonify({"error": str(e)}), 503, {'Retry-After': '5'}
+            return jsonify(job_json(state)), 202, {'Location': f"/api/presentations/jobs/{state['job_id']}"}
+
+        # Slides já renderizados vêm do cache; os novos são renderizados aqui mesmo
+        # (o pool fica para jobs e lotes, que respeitam o limite da fila)
+        pdf_content = render_deck(markdown_content, title, theme, footer)
+        pdf_cache.put(cache_key, pdf_content)
+        return pdf_response(pdf_content, pdf_filename(title), cache_key, 'MISS')
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def batch_document(document, defaults):
+    """Dict que o `batch_zip` espera; documentos inválidos ficam só com `error`"""
+    if not isinstance(document, dict):
+        return {"filename": "documento.pdf", "error": "Document must be an object"}
+    document = {**defaults, **document}
+    title = str(document.get('title', 'Apresentação'))
+    filename = os.path.basename(str(document.get('filename') or pdf_filename(title))) or pdf_filename(title)
+    if not filename.lower().endswith('.pdf'):
+        filename += '.pdf'
+    if not isinstance(document.get('markdown'), str):
+        return {"filename": filename, "error": "Markdown content is required"}
+    try:
+        footer = request_footer(document)
+    except ValueError as e:
+        return {"filename": filename, "error": str(e)}
+    theme = resolve_theme(document.get('theme', 'default'))
+    return {
+        "filename": filename,
+        "markdown": document['markdown'],
+        "title": title,
+        "theme": theme,
+        "footer": footer,
+        "cache_key": pdf_cache.key(document['markdown'], title, theme, footer),
+    }
+
+@presentations_bp.route('/presentations/batch', methods=['POST'])
+def convert_batch():
+    """Converte vários documentos em paralelo e devolve um ZIP em streaming"""
+    data = request.get_json(silent=True)
+    documents = data.get('documents') if isinstance(data, dict) else None
+    if not isinstance(documents, list) or not documents:
+        return jsonify({"error": "A non-empty 'documents' list is required"}), 400
+    if len(documents) > MAX_DOCUMENTS:
+        return jsonify({"error": f"At most {MAX_DOCUMENTS} documents per batch"}), 413
+
+    # theme/footer/generated_at no topo valem para todos os documentos
+    defaults = {key: data[key] for key in ('theme', 'footer', 'generated_at') if key in data}
+    documents = [batch_document(document, defaults) for document in documents]
+    if not pdf_jobs.has_room():
+        return jsonify({"error": "fila de renderização cheia"}), 503, {'Retry-After': '5'}
+    return Response(batch_zip(documents), mimetype='application/zip',
+                    headers=attachment(data.get('filename') or 'apresentacoes.zip'))
+
+@presentations_bp.route('/presentations/jobs/<job_id>', methods=['GET'])
+def get_conversion_job(job_id):
+    """Estado do job; com ?wait=N espera até N segundos ele terminar"""
+    if not JOB_ID.match(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_POLL_WAIT)
+    state = pdf_jobs.wait(job_id, wait) if wait else pdf_jobs.status(job_id)
+    if state is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_json(state))
+
+@presentations_bp.route('/presentations/jobs/<job_id>/result', methods=['GET'])
+def get_conversion_result(job_id):
+    """PDF de um job concluído, no mesmo formato (JSON ou binário) da conversão síncrona"""
+    state = pdf_jobs.status(job_id) if JOB_ID.match(job_id) else None
+    if state is None:
+        return jsonify({"error": "Job not found"}), 404
+    if state['status'] == 'failed':
+        return jsonify({"error": state.get('error', 'Rendering failed')}), 500
+    if state['status'] != 'done':
+        return jsonify(job_json(state)), 409
+    try:
+        if wants_pdf():
+            # Direto do disco, sem carregar o PDF inteiro na memória
+            response = send_file(pdf_jobs.result_path(job_id), mimetype='application/pdf', as_attachment=True,
+                                 download_name=state['filename'], etag=state.get('cache_key') or True)
+            response.vary.add('Accept')
+            return response
+        pdf_content = pdf_jobs.read_result(job_id)
+    except FileNotFoundError:
+        return jsonify({"error": "Job not found"}), 404
+    return pdf_response(pdf_content, state['filename'], state.get('cache_key'))
+
+@presentations_bp.route('/presentations/metrics', methods=['GET'])
+def get_presentation_metrics():
+    """Uso do cache de PDFs e da fila de renderização"""
+    return jsonify({
+        "pdf": pdf_cache.stats(),
+        "pdf_jobs": pdf_jobs.stats()
+    })
+
 @presentations_bp.route('/presentations/templates', methods=['GET'])
 def get_presentation_templates():
     """Retorna templates de apresentação disponíveis"""
     templates = [
-        {
-            "name": "default",
-            "title": "Padrão",
-            "description": "Template padrão com gradiente azul/roxo"
-        },
-        {
-            "name": "corporate",
-            "title": "Corporativo",
-            "description": "Template profissional para apresentações empresariais"
-        },
-        {
-            "name": "academic",
-            "title": "Acadêmico",
-            "description": "Template para apresentações acadêmicas e científicas"
-        }
+        {"name": name, "title": theme['title'], "description": theme['description']}
+        for name, theme in THEMES.items()
     ]
     
     return jsonify(templates)
@@ -1,8 +1,15 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.models.table_version import get_table_version
+from shared.conditional import ConditionalGet
 
 user_bp = Blueprint('user', __name__)
 
+# GETs de usuários respondem 304 enquanto a tabela não mudar
+conditional = ConditionalGet(user_bp)
+conditional.track('get_users', lambda: get_table_version('user'))
+conditional.track('get_user', lambda: get_table_version('user'))
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
     users = User.query.all()
@@ -0,0 +1,21 @@
+"""
+Servidor de produção do Pikachu REST API (gunicorn; opções e recarga de
+código em `shared/serve.py`).
+
+Uso:
+    python src/serve.py                      # workers = 2 * CPUs + 1
+    python src/serve.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+
+O `python src/main.py` continua disponível apenas para desenvolvimento.
+"""
+
+import os
+import sys
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import src  # noqa: F401 (põe o pacote shared no sys.path)
+from shared.serve import main
+
+if __name__ == '__main__':
+    main(default_app='src.app:create_app')
@@ -0,0 +1,96 @@
+"""
+Cliente HTTP assíncrono (httpx) para as rotas ASGI de `routes/astro_async.py`.
+
+Mesmas regras do cliente síncrono (`http_client.py`): pool de conexões
+keep-alive, timeouts de conexão/leitura e retries em falhas de conexão. As
+métricas e os circuit breakers são os mesmos do `http_client`, então
+`/api/metrics/upstreams` e `/api/health/upstreams` mostram as duas pilhas
+juntas, assim como o orçamento de chamadas (`rate_budget`). Circuito aberto
+ou orçamento esgotado viram `httpx.ConnectError` com a exceção original
+encadeada, que as rotas respondem com 503 e Retry-After.
+
+O `httpx.AsyncClient` pertence ao event loop: ele é aberto e fechado no
+lifespan do app ASGI (`src/asgi.py`).
+"""
+
+import asyncio
+import os
+import time
+
+import httpx
+
+from shared.circuit_breaker import CircuitOpenError
+from shared.http_client import CONNECT_TIMEOUT, MAX_RETRIES, READ_TIMEOUT, HttpClient, http_client
+from shared.rate_budget import RateBudgetExceeded
+
+MAX_CONNECTIONS = int(os.environ.get('HTTP_ASYNC_MAX_CONNECTIONS', 1000))
+MAX_KEEPALIVE = int(os.environ.get('HTTP_ASYNC_MAX_KEEPALIVE', 100))
+
+
+class AsyncHttpClient:
+    """httpx.AsyncClient com limites de pool, timeouts e métricas por upstream"""
+
+    def __init__(self, metrics=None, breakers=None, budget=None):
+        self.metrics = metrics or http_client.metrics
+        self.breakers = breakers or http_client.breakers
+        self.budget = budget or http_client.budget
+        self.client = None
+
+    async def open(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+                transport=httpx.AsyncHTTPTransport(retries=MAX_RETRIES),
+            )
+        return self
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def request(self, method, url, **kwargs):
+        await self.open()
+        upstream = HttpClient.upstream_name(url)
+        breaker = self.breakers.get(upstream)
+        try:
+            # Circuito aberto falha antes de gastar ficha do orçamento
+            breaker.before_request()
+        except CircuitOpenError as e:
+            raise httpx.ConnectError(str(e)) from e
+        try:
+            await self.budget.acquire_async(upstream)
+        except RateBudgetExceeded as e:
+            breaker.release()
+            raise httpx.ConnectError(str(e)) from e
+        except BaseException:
+            breaker.release()
+            raise
+        start = time.monotonic()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            elapsed = time.monotonic() - start
+            self.metrics.record(upstream, elapsed, error=type(e).__name__)
+            breaker.record(False, elapsed, error=type(e).__name__)
+            raise
+        except BaseException:
+            # Cancelada (ex.: perdeu o hedge): não conta como sucesso nem falha
+            breaker.release()
+            raise
+        elapsed = time.monotonic() - start
+        self.metrics.record(upstream, elapsed, status=response.status_code)
+        breaker.record(response.status_code < 500, elapsed, error=f'HTTP {response.status_code}')
+        # SQLite bloqueia: fora do event loop
+        await asyncio.to_thread(self.budget.observe, upstream, response.headers, response.status_code)
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+
+async_http_client = AsyncHttpClient()
@@ -0,0 +1,112 @@
+"""
+Conversão em lote de apresentações, devolvida como um ZIP em streaming.
+
+Os documentos já presentes no cache de PDFs entram primeiro; os demais são
+renderizados em paralelo no pool de processos (`pdf_jobs.render_many`) e
+cada PDF é escrito no ZIP assim que fica pronto, sem montar o arquivo
+inteiro na memória. Falhas não interrompem o lote: o `manifest.json`, último
+arquivo do ZIP, traz o resultado de cada documento (ok ou erro). Se a fila
+de renderização encher no meio do lote, os documentos que faltam entram no
+manifesto como falha.
+"""
+
+import json
+import os
+import zipfile
+
+from src.services.pdf_cache import pdf_cache
+from src.services.pdf_jobs import QueueFull, pdf_jobs
+
+MAX_DOCUMENTS = int(os.environ.get('PDF_BATCH_MAX_DOCUMENTS', 100))
+MANIFEST_NAME = 'manifest.json'
+
+
+class ZipStream:
+    """Destino sem seek para o ZipFile: acumula os bytes até o próximo `drain()`"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def unique_filename(filename, used):
+    """Evita nomes repetidos dentro do ZIP (aula.pdf, aula-2.pdf, ...)"""
+    base, ext = os.path.splitext(filename)
+    candidate, n = filename, 1
+    while candidate in used or candidate == MANIFEST_NAME:
+        n += 1
+        candidate = f'{base}-{n}{ext}'
+    used.add(candidate)
+    return candidate
+
+
+def batch_zip(documents, cache=pdf_cache, jobs=pdf_jobs):
+    """Gera os bytes do ZIP de `documents`.
+
+    Cada documento é um dict com `filename` e, se válido, `markdown`, `title`,
+    `theme`, `footer` e `cache_key`; inválidos chegam só com `error`.
+    """
+    stream = ZipStream()
+    archive = zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED)
+    used = set()
+    manifest = []
+    for index, document in enumerate(documents):
+        entry = {'index': index, 'filename': unique_filename(document['filename'], used)}
+        if document.get('error'):
+            entry.update(status='failed', error=document['error'])
+        manifest.append(entry)
+
+    def add(index, pdf_content, cached):
+        # PDF já é comprimido por dentro: ZIP_STORED não gasta CPU à toa
+        archive.writestr(manifest[index]['filename'], pdf_content)
+        manifest[index].update(status='ok', size=len(pdf_content), cached=cached)
+
+    to_render = []
+    for index, document in enumerate(documents):
+        if 'status' in manifest[index]:
+            continue
+        pdf_content = cache.get(document['cache_key'])
+        if pdf_content is None:
+            to_render.append(index)
+            continue
+        add(index, pdf_content, True)
+        yield stream.drain()
+
+    args = [
+        (documents[i]['markdown'], documents[i]['title'], documents[i]['theme'], documents[i]['footer'])
+        for i in to_render
+    ]
+    try:
+        for position, pdf_content, error in jobs.render_many(args):
+            index = to_render[position]
+            if error:
+                manifest[index].update(status='failed', error=error)
+                continue
+            cache.put(documents[index]['cache_key'], pdf_content)
+            add(index, pdf_content, False)
+            yield stream.drain()
+    except QueueFull as e:
+        for index in to_render:
+            if 'status' not in manifest[index]:
+                manifest[index].update(status='failed', error=str(e))
+
+    summary = {
+        'documents': len(manifest),
+        'ok': sum(1 for entry in manifest if entry['status'] == 'ok'),
+        'failed': sum(1 for entry in manifest if entry['status'] == 'failed'),
+        'results': manifest,
+    }
+    archive.writestr(MANIFEST_NAME, json.dumps(summary, ensure_ascii=False, indent=2), zipfile.ZIP_DEFLATED)
+    archive.close()
+    yield stream.drain()
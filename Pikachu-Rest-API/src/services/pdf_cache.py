@@ -0,0 +1,230 @@
+"""
+Cache endereçado por conteúdo dos PDFs de apresentação.
+
+A chave é o SHA-256 das entradas normalizadas (markdown com quebras de linha
+unificadas, título, tema, texto do rodapé e versão do template), então o
+mesmo pedido reenviado (retry, novo download) devolve os bytes já
+renderizados, com a chave como ETag forte. Os PDFs ficam em disco
+(PDF_CACHE_DIR) e o índice LRU (tamanho e último uso de cada PDF) fica num
+SQLite no mesmo diretório, compartilhado pelos workers do gunicorn e pelos
+processos da fila de jobs: quando o total passa de PDF_CACHE_MAX_BYTES os
+menos usados são apagados, então o teto vale para a máquina inteira, não
+por processo. PDF_CACHE_MAX_BYTES=0 desliga o cache.
+
+O rodapé "Gerado em" entra na chave: com o padrão (data e hora) só há acerto
+dentro do mesmo minuto; `footer: "date"`, `footer: "none"` ou `generated_at`
+tornam a saída determinística.
+
+Decks divididos em slides (`slide_deck.py`) também guardam aqui cada slide
+renderizado (`slide_key`), dentro do mesmo teto de bytes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from src.services.pdf_renderer import TEMPLATE_VERSION
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), 'pikachu-pdf-cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+INDEX_NAME = 'index.db'
+
+
+class PdfCache:
+    """PDFs em disco com índice LRU compartilhado (SQLite) e teto de bytes"""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.local = threading.local()
+        self.initialized = False
+        self.init_lock = threading.Lock()
+        self.lock = threading.Lock()  # contadores deste processo
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            directory=os.environ.get('PDF_CACHE_DIR') or DEFAULT_DIR,
+            max_bytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+        )
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(markdown_content, title, theme, footer):
+        normalized = markdown_content.replace('\r\n', '\n').replace('\r', '\n').strip()
+        payload = json.dumps([TEMPLATE_VERSION, normalized, title.strip(), theme, footer], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def slide_key(slide_markdown, theme, footer):
+        """Chave de um slide renderizado sozinho (reaproveitado entre decks e títulos)"""
+        normalized = slide_markdown.replace('\r\n', '\n').replace('\r', '\n').strip()
+        payload = json.dumps([TEMPLATE_VERSION, 'slide', normalized, theme, footer], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.pdf')
+
+    def connect(self):
+        """Conexão da thread atual com o índice (recriada após fork)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, INDEX_NAME), timeout=5, isolation_level=None)
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        if not self.initialized:
+            with self.init_lock:
+                if not self.initialized:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS pdf_cache ('
+                        'key TEXT PRIMARY KEY, size INTEGER NOT NULL, used_at REAL NOT NULL)'
+                    )
+                    conn.execute('CREATE INDEX IF NOT EXISTS ix_pdf_cache_used_at ON pdf_cache (used_at)')
+                    if conn.execute('SELECT 1 FROM pdf_cache LIMIT 1').fetchone() is None:
+                        self.load(conn)
+                    self.initialized = True
+        return conn
+
+    def load(self, conn):
+        """Índice novo (ou apagado): indexa os PDFs que já estão no disco, pelo mtime"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.pdf'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((name[:-4], stat.st_size, stat.st_mtime))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('INSERT OR IGNORE INTO pdf_cache (key, size, used_at) VALUES (?, ?, ?)', entries)
+            self.evict(conn)
+        finally:
+            conn.execute('COMMIT')
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        conn = self.connect()
+        try:
+            with open(self.path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            # Apagado fora do índice: a linha não pode continuar contando no teto
+            conn.execute('DELETE FROM pdf_cache WHERE key = ?', (key,))
+            return None
+        with self.lock:
+            self.hits += 1
+        conn.execute(
+            'INSERT INTO pdf_cache (key, size, used_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET used_at = excluded.used_at',
+            (key, len(data), time.time()),
+        )
+        return data
+
+    def put(self, key, data):
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.track(key, len(data))
+
+    def put_file(self, key, source):
+        """Copia para o cache um PDF já gravado em disco (resultado de job)"""
+        if not self.enabled:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        self.track(key, os.path.getsize(path))
+
+    def track(self, key, size):
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO pdf_cache (key, size, used_at) VALUES (?, ?, ?)',
+                (key, size, time.time()),
+            )
+            self.evict(conn)
+        finally:
+            conn.execute('COMMIT')
+
+    def evict(self, conn):
+        """Apaga os menos usados até o total caber no teto (dentro da transação de quem chamou)"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM pdf_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        cursor = conn.execute('SELECT key, size FROM pdf_cache ORDER BY used_at')
+        for key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            victims.append(key)
+            total -= size
+        cursor.close()
+        conn.executemany('DELETE FROM pdf_cache WHERE key = ?', [(key,) for key in victims])
+        for key in victims:
+            try:
+                os.unlink(self.path(key))
+            except FileNotFoundError:
+                pass
+        with self.lock:
+            self.evictions += len(victims)
+
+    def stats(self):
+        entries, size = 0, 0
+        if self.enabled:
+            entries, size = self.connect().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pdf_cache'
+            ).fetchone()
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def clear(self):
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for (key,) in conn.execute('SELECT key FROM pdf_cache').fetchall():
+                try:
+                    os.unlink(self.path(key))
+                except FileNotFoundError:
+                    pass
+            conn.execute('DELETE FROM pdf_cache')
+        finally:
+            conn.execute('COMMIT')
+
+
+pdf_cache = PdfCache.from_env()
@@ -0,0 +1,296 @@
+"""
+Fila de jobs de renderização de PDF para `/presentations/convert`.
+
+O handler só enfileira e devolve o id do job; o WeasyPrint roda num
+`ProcessPoolExecutor` com PDF_WORKERS processos, sem ocupar as threads do
+servidor nem disputar o GIL. A fila é limitada: com PDF_QUEUE_SIZE jobs
+esperando além dos que já estão renderizando, `submit` levanta `QueueFull`
+e a rota responde 503.
+
+O mesmo pool atende os lotes de `render_many` (um documento por processo de
+cada vez, resultados na ordem em que terminam), e os documentos de lote em
+andamento contam no mesmo limite da fila. Cada worker do gunicorn tem o
+próprio pool, então o total de processos de renderização é workers ×
+PDF_WORKERS; por isso o padrão é pequeno: min(CPUs, 4).
+
+O estado e o PDF de cada job ficam em PDF_JOB_DIR (um `<id>.json` e um
+`<id>.pdf`), então qualquer worker do gunicorn responde ao polling, não só o
+que recebeu o POST. Jobs terminados expiram após PDF_JOB_TTL segundos.
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+
+from src.services.pdf_cache import pdf_cache
+from src.services.pdf_renderer import pdf_filename, warm_up
+from src.services.slide_deck import render_deck
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS/Windows
+        return os.cpu_count() or 1
+
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), 'pikachu-pdf-jobs')
+MAX_WORKERS = int(os.environ.get('PDF_WORKERS', min(available_cpus(), 4)))
+MAX_PENDING = int(os.environ.get('PDF_QUEUE_SIZE', 16))
+JOB_TTL = float(os.environ.get('PDF_JOB_TTL', 600))
+POLL_INTERVAL = 0.2
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+
+class QueueFull(Exception):
+    """Fila de renderização cheia"""
+
+
+def render_job(directory, job_id, markdown_content, title, theme, footer):
+    """Roda no processo do pool: renderiza e grava o PDF do job"""
+    pdf_content = render_deck(markdown_content, title, theme, footer)
+    path = os.path.join(directory, f'{job_id}.pdf')
+    with open(path + '.tmp', 'wb') as f:
+        f.write(pdf_content)
+    os.replace(path + '.tmp', path)
+    return len(pdf_content)
+
+
+def render_document(markdown_content, title, theme, footer):
+    """Roda no processo do pool: bytes do PDF de um documento de lote"""
+    return render_deck(markdown_content, title, theme, footer)
+
+
+class PdfJobQueue:
+    """Pool de processos de renderização com fila limitada e estado em disco"""
+
+    def __init__(self, directory=DEFAULT_DIR, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL,
+                 cache=pdf_cache):
+        self.directory = directory
+        self.cache = cache
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.pool = None
+        self.pool_pid = None
+        self.futures = {}  # jobs deste processo ainda não terminados
+        self.batch_active = 0  # documentos de lote deste processo no pool
+        self.last_cleanup = 0.0
+        self.submitted = 0
+        self.rejected = 0
+
+    def executor(self):
+        """Pool criado sob demanda e recriado após fork ou se um processo morrer"""
+        if self.pool is None or self.pool_pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            # spawn: o servidor tem threads, e fork com threads pode herdar locks presos.
+            # Cada processo aquece o renderer ao subir e continua vivo entre jobs.
+            self.pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=warm_up)
+            self.pool_pid = os.getpid()
+            self.futures = {}
+            self.batch_active = 0
+        return self.pool
+
+    def in_flight(self):
+        """Jobs e documentos de lote deste processo no pool (chamar com o lock)"""
+        if self.pool_pid != os.getpid():
+            return 0
+        return len(self.futures) + self.batch_active
+
+    def has_room(self):
+        """Cabe mais uma tarefa: menos de max_workers + max_pending em andamento"""
+        with self.lock:
+            return self.in_flight() < self.max_workers + self.max_pending
+
+    def submit(self, markdown_content, title='Apresentação', theme='default', footer=None, cache_key=None):
+        """Enfileira a renderização e retorna o estado inicial do job"""
+        self.cleanup()
+        job_id = uuid.uuid4().hex
+        state = {
+            'job_id': job_id,
+            'status': QUEUED,
+            'filename': pdf_filename(title),
+            'cache_key': cache_key,
+            'created_at': time.time(),
+        }
+        with self.lock:
+            self.executor()
+            if self.in_flight() >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise QueueFull('fila de renderização cheia')
+            self.write_state(state)
+            future = self.submit_task(render_job, self.directory, job_id, markdown_content, title, theme, footer)
+            self.futures[job_id] = future
+            self.submitted += 1
+        future.add_done_callback(lambda future: self.complete(state, future))
+        return state
+
+    def submit_task(self, fn, *args):
+        """Envia ao pool (chamar com o lock); um pool quebrado é recriado uma vez"""
+        try:
+            return self.executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self.pool = None
+            return self.executor().submit(fn, *args)
+
+    def render_many(self, documents):
+        """Renderiza [(markdown, título, tema, rodapé)] e gera (índice, pdf, erro) conforme terminam.
+
+        Sem vaga na fila para o próximo documento e sem nenhum do lote em
+        andamento, levanta QueueFull; os documentos ainda não gerados ficam
+        sem resultado.
+        """
+        documents = iter(enumerate(documents))
+        item = next(documents, None)
+        pending = {}
+        try:
+            while item is not None or pending:
+                submitted = []
+                with self.lock:
+                    self.executor()
+                    # Janela de um documento por processo, e só enquanto a fila tiver vaga
+                    while (item is not None and len(pending) < self.max_workers
+                           and self.in_flight() < self.max_workers + self.max_pending):
+                        index, args = item
+                        future = self.submit_task(render_document, *args)
+                        pending[future] = index
+                        self.batch_active += 1
+                        submitted.append(future)
+                        item = next(documents, None)
+                    if not pending:
+                        self.rejected += 1
+                        raise QueueFull('fila de renderização cheia')
+                # Fora do lock: o callback roda na hora se o future já terminou
+                for future in submitted:
+                    future.add_done_callback(self.batch_done)
+                done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        pdf_content = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            with self.lock:
+                                self.pool = None
+                        yield index, None, str(e) or type(e).__name__
+                    else:
+                        yield index, pdf_content, None
+        finally:
+            # Cliente desconectou no meio do lote: descarta o que nem começou
+            for future in pending:
+                future.cancel()
+
+    def batch_done(self, future):
+        with self.lock:
+            self.batch_active = max(self.batch_active - 1, 0)
+
+    def complete(self, state, future):
+        try:
+            size = future.result()
+        except Exception as e:
+            state = {**state, 'status': FAILED, 'error': str(e) or type(e).__name__}
+            if isinstance(e, BrokenProcessPool):
+                with self.lock:
+                    self.pool = None
+        else:
+            state = {**state, 'status': DONE, 'size': size}
+            if state['cache_key']:
+                try:
+                    self.cache.put_file(state['cache_key'], self.result_path(state['job_id']))
+                except OSError:
+                    pass  # sem cache o job continua válido
+        state['finished_at'] = time.time()
+        self.write_state(state)
+        with self.finished:
+            self.futures.pop(state['job_id'], None)
+            self.finished.notify_all()
+
+    def state_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def result_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.pdf')
+
+    def write_state(self, state):
+        path = self.state_path(state['job_id'])
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    def status(self, job_id):
+        """Estado do job ou None se não existir (ou já expirou)"""
+        try:
+            with open(self.state_path(job_id)) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        with self.lock:
+            future = self.futures.get(job_id) if self.pool_pid == os.getpid() else None
+        if state['status'] == QUEUED and future is not None and future.running():
+            state['status'] = RUNNING
+        return state
+
+    def wait(self, job_id, timeout):
+        """Long-poll: espera até `timeout` segundos o job terminar"""
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self.status(job_id)
+            remaining = deadline - time.monotonic()
+            if state is None or state['status'] in FINISHED or remaining <= 0:
+                return state
+            with self.finished:
+                if job_id in self.futures:
+                    # Job deste processo: acorda assim que terminar
+                    self.finished.wait(remaining)
+                    continue
+            # Job de outro worker: só dá para acompanhar pelo arquivo
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+    def read_result(self, job_id):
+        with open(self.result_path(job_id), 'rb') as f:
+            return f.read()
+
+    def cleanup(self):
+        """Apaga jobs expirados (no máximo uma vez por minuto)"""
+        now = time.time()
+        if now - self.last_cleanup < 60:
+            return
+        self.last_cleanup = now
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                if now - entry.stat().st_mtime > self.ttl:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            active = self.in_flight()
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'active': active,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+        }
+
+
+pdf_jobs = PdfJobQueue(directory=os.environ.get('PDF_JOB_DIR') or DEFAULT_DIR)
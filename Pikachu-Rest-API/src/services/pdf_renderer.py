@@ -0,0 +1,319 @@
+"""
+Renderização das apresentações: Markdown -> HTML do template -> PDF (WeasyPrint).
+
+Fica fora das rotas para rodar tanto no handler (entradas pequenas) quanto
+nos processos da fila de jobs (`pdf_jobs.py`).
+
+O custo fixo de cada render fica fora do caminho da requisição: a folha de
+estilo de cada tema (`THEMES`) é montada e parseada uma única vez como
+`CSS`, o conversor Markdown é reaproveitado com `reset()` e as fontes ficam
+carregadas num `FontConfiguration` compartilhado pelos renders. Esse estado
+é um só por processo, usado por todas as threads do servidor; como o
+WeasyPrint não garante uso concorrente dos mesmos objetos, os renders de um
+processo são serializados por um lock (o layout é Python puro e já disputa o
+GIL; o paralelismo vem dos workers e da fila de jobs). `warm_up()` faz um
+render descartável: roda ao registrar o blueprint (no mestre do gunicorn,
+então os workers nascem do fork com o renderer já aquecido) e ao iniciar
+cada processo da fila de jobs.
+"""
+
+import re
+import threading
+from datetime import datetime
+
+import markdown
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+# Suba quando o template mudar: invalida o cache de PDFs (`pdf_cache.py`)
+TEMPLATE_VERSION = 4
+FOOTER_MODES = ('datetime', 'date', 'none')
+DEFAULT_THEME = 'default'
+
+# Um slide começa em cada título `#`/`##` ou depois de uma linha `---`
+SLIDE_HEADING = re.compile(r'^#{1,2}\s')
+SLIDE_RULE = re.compile(r'^\s{0,3}(-{3,}|\*{3,}|_{3,})\s*$')
+CODE_FENCE = re.compile(r'^\s{0,3}(```|~~~)')
+# Marcador entre slides no Markdown do deck; sai intacto no HTML (bloco HTML bruto)
+SLIDE_BREAK = '<!-- slide-break -->'
+
+THEMES = {
+    'default': {
+        'title': 'Padrão',
+        'description': 'Template padrão com gradiente azul/roxo',
+        'font': "'Arial', sans-serif",
+        'background': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        'primary': '#667eea',
+        'secondary': '#764ba2',
+        'text': '#333',
+        'radius': '15px',
+    },
+    'corporate': {
+        'title': 'Corporativo',
+        'description': 'Template profissional para apresentações empresariais',
+        'font': "'Helvetica', 'Arial', sans-serif",
+        'background': '#e9edf2',
+        'primary': '#1f3a5f',
+        'secondary': '#2e6da4',
+        'text': '#2b2b2b',
+        'radius': '4px',
+    },
+    'academic': {
+        'title': 'Acadêmico',
+        'description': 'Template para apresentações acadêmicas e científicas',
+        'font': "'Georgia', 'Times New Roman', serif",
+        'background': '#f5f2ea',
+        'primary': '#7a1f1f',
+        'secondary': '#3d3d3d',
+        'text': '#222',
+        'radius': '0',
+    },
+}
+
+
+def theme_css(theme):
+    """Folha de estilo completa de um tema"""
+    t = THEMES[theme]
+    return f"""
+        @page {{
+            size: A4 landscape;
+            margin: 2cm;
+        }}
+
+        body {{
+            font-family: {t['font']};
+            line-height: 1.6;
+            color: {t['text']};
+            background: {t['background']};
+            margin: 0;
+            padding: 20px;
+        }}
+
+        .slide {{
+            background: white;
+            padding: 40px;
+            margin-bottom: 30px;
+            border-radius: {t['radius']};
+            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
+            page-break-after: always;
+            min-height: 500px;
+        }}
+
+        .slide:last-child {{
+            page-break-after: avoid;
+        }}
+
+        h1 {{
+            color: {t['primary']};
+            font-size: 2.5em;
+            margin-bottom: 20px;
+            text-align: center;
+            border-bottom: 3px solid {t['primary']};
+            padding-bottom: 10px;
+        }}
+
+        h2 {{
+            color: {t['secondary']};
+            font-size: 2em;
+            margin-top: 30px;
+            margin-bottom: 15px;
+        }}
+
+        h3 {{
+            color: #555;
+            font-size: 1.5em;
+            margin-top: 25px;
+            margin-bottom: 10px;
+        }}
+
+        p {{
+            font-size: 1.1em;
+            margin-bottom: 15px;
+            text-align: justify;
+        }}
+
+        ul, ol {{
+            font-size: 1.1em;
+            margin-left: 20px;
+        }}
+
+        li {{
+            margin-bottom: 8px;
+        }}
+
+        code {{
+            background: #f4f4f4;
+            padding: 2px 6px;
+            border-radius: 3px;
+            font-family: 'Courier New', monospace;
+        }}
+
+        pre {{
+            background: #f8f8f8;
+            padding: 15px;
+            border-radius: 5px;
+            border-left: 4px solid {t['primary']};
+            overflow-x: auto;
+        }}
+
+        blockquote {{
+            border-left: 4px solid {t['secondary']};
+            margin: 20px 0;
+            padding: 10px 20px;
+            background: #f9f9f9;
+            font-style: italic;
+        }}
+
+        .footer {{
+            position: fixed;
+            bottom: 20px;
+            right: 20px;
+            font-size: 0.9em;
+            color: #666;
+        }}
+    """
+
+
+# Montadas uma vez no import; o parse para `CSS` fica com cada renderer
+THEME_CSS = {name: theme_css(name) for name in THEMES}
+
+
+def resolve_theme(theme):
+    """Tema pedido ou o padrão, se não existir"""
+    return theme if theme in THEMES else DEFAULT_THEME
+
+
+def split_slides(markdown_content):
+    """Divide o deck em slides nos títulos `#`/`##` e nas linhas `---` (fora de blocos de código).
+
+    Um `---` logo abaixo de uma linha de texto é título setext, não separador.
+    """
+    slides, current = [], []
+    fence = None
+    for line in markdown_content.replace('\r\n', '\n').split('\n'):
+        match = CODE_FENCE.match(line)
+        if match:
+            if fence is None:
+                fence = match.group(1)
+            elif match.group(1) == fence:
+                fence = None
+        elif fence is None:
+            setext = current and current[-1].strip() and line.strip().startswith('-')
+            if SLIDE_RULE.match(line) and not setext:
+                slides.append(current)
+                current = []
+                continue
+            if SLIDE_HEADING.match(line) and any(text.strip() for text in current):
+                slides.append(current)
+                current = []
+        current.append(line)
+    slides.append(current)
+    return ['\n'.join(lines).strip('\n') for lines in slides if any(line.strip() for line in lines)]
+
+
+def footer_text(mode='datetime', generated_at=None):
+    """Rodapé "Gerado em"; `date`/`none` ou um `generated_at` fixo dão saída determinística"""
+    if mode not in FOOTER_MODES:
+        raise ValueError(f"footer deve ser um de: {', '.join(FOOTER_MODES)}")
+    if mode == 'none':
+        return ''
+    moment = generated_at or datetime.now()
+    if mode == 'date':
+        return f"Gerado em {moment.strftime('%d/%m/%Y')}"
+    return f"Gerado em {moment.strftime('%d/%m/%Y às %H:%M')}"
+
+
+def pdf_filename(title):
+    return f"{title.replace(' ', '_')}.pdf"
+
+
+class PresentationRenderer:
+    """Conversor Markdown, fontes e folhas de estilo já parseadas, reaproveitados entre renders.
+
+    Seguro entre threads: `lock` serializa o parse dos temas e os renders.
+    """
+
+    def __init__(self):
+        self.md = markdown.Markdown(extensions=['extra', 'codehilite'])
+        self.font_config = FontConfiguration()
+        self.stylesheets = {}
+        self.renders = 0
+        self.lock = threading.Lock()
+
+    def stylesheet(self, theme):
+        """`CSS` do tema, parseado na primeira vez (chamar com o lock)"""
+        css = self.stylesheets.get(theme)
+        if css is None:
+            css = self.stylesheets[theme] = CSS(string=THEME_CSS[theme], font_config=self.font_config)
+        return css
+
+    def markdown_to_html(self, markdown_content):
+        self.md.reset()
+        return self.md.convert(markdown_content)
+
+    def render_html(self, markdown_content, title='Apresentação', footer=None):
+        """HTML completo da apresentação, um `.slide` por slide (`footer` None = data e hora atuais)"""
+        if footer is None:
+            footer = footer_text()
+        footer_html = f'<div class="footer">{footer}</div>' if footer else ''
+        # Uma conversão só para o deck inteiro: links por referência e notas de
+        # rodapé valem de um slide para outro; o HTML é cortado nos marcadores
+        slides = split_slides(markdown_content) or ['']
+        body = self.markdown_to_html(f'\n\n{SLIDE_BREAK}\n\n'.join(slides))
+        html_content = '\n'.join(
+            f'<div class="slide">\n{part.strip()}\n</div>' for part in body.split(SLIDE_BREAK)
+        )
+
+        # Template HTML para apresentação (o estilo vem do tema já parseado)
+        return f"""
+        <!DOCTYPE html>
+        <html lang="pt-BR">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>{title}</title>
+        </head>
+        <body>
+            {html_content}
+            {footer_html}
+        </body>
+        </html>
+        """
+
+    def render_pdf(self, markdown_content, title='Apresentação', theme=DEFAULT_THEME, footer=None):
+        with self.lock:
+            html = HTML(string=self.render_html(markdown_content, title, footer))
+            self.renders += 1
+            return html.write_pdf(stylesheets=[self.stylesheet(resolve_theme(theme))], font_config=self.font_config)
+
+    def warm_up(self):
+        """Parseia todos os temas e faz um render pequeno para carregar as fontes"""
+        with self.lock:
+            for theme in THEMES:
+                self.stylesheet(theme)
+            warm = self.renders > 0
+        if not warm:
+            self.render_pdf('# Aquecimento\n\n- `código`', footer='')
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def renderer():
+    """Renderer do processo, compartilhado por todas as threads"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PresentationRenderer()
+    return _renderer
+
+
+def warm_up():
+    renderer().warm_up()
+
+
+def render_pdf(markdown_content, title='Apresentação', theme=DEFAULT_THEME, footer=None):
+    """Bytes do PDF da apresentação, gerados em memória (sem arquivo temporário)"""
+    return renderer().render_pdf(markdown_content, title, theme, footer)
@@ -0,0 +1,61 @@
+"""
+Renderização incremental de decks longos, slide a slide.
+
+Num deck com pelo menos PDF_SPLIT_MIN_SLIDES slides (`split_slides`: títulos
+`#`/`##` ou `---`), cada slide vira um PDF próprio: o WeasyPrint monta vários
+layouts pequenos em vez de um fluxo enorme, cujo tempo e memória crescem
+mais que linearmente com o tamanho do deck. Os slides ficam no cache de PDFs
+(`pdf_cache.slide_key`), então ao editar um deck só os slides alterados são
+renderizados de novo, um por vez, no processo que chamou (o handler ou o
+processo do job). No fim o pypdf junta tudo num PDF só.
+
+Limites da divisão: como cada slide é convertido sozinho, definições de
+referência (`[id]: url`) e notas de rodapé (`[^1]: ...`) não atravessariam
+slides, então um deck que as tenha vai inteiro para o render único. Cada
+slide embute o próprio subconjunto de fontes, então o PDF final tende a ser
+maior que o do render único. PDF_SPLIT_MIN_SLIDES=0 desliga a divisão.
+"""
+
+import io
+import os
+import re
+
+from pypdf import PdfReader, PdfWriter
+
+from src.services.pdf_cache import pdf_cache
+from src.services.pdf_renderer import render_pdf, split_slides
+
+SPLIT_MIN_SLIDES = int(os.environ.get('PDF_SPLIT_MIN_SLIDES', 4))
+# Definição de link por referência ou de nota de rodapé (`[id]: ...`, `[^1]: ...`)
+REFERENCE_DEFINITION = re.compile(r'^ {0,3}\[[^\]]+\]:', re.M)
+
+
+def merge_pdfs(parts, title):
+    """Um PDF com as páginas de `parts`, na ordem"""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)))
+    writer.add_metadata({'/Title': title})
+    # Objetos repetidos entre os slides (imagens, fontes iguais) entram uma vez
+    writer.compress_identical_objects()
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def render_deck(markdown_content, title='Apresentação', theme='default', footer=None, cache=pdf_cache):
+    """Bytes do PDF do deck, reaproveitando slides do cache"""
+    if not SPLIT_MIN_SLIDES or REFERENCE_DEFINITION.search(markdown_content):
+        return render_pdf(markdown_content, title, theme, footer)
+    slides = split_slides(markdown_content)
+    if len(slides) < SPLIT_MIN_SLIDES:
+        return render_pdf(markdown_content, title, theme, footer)
+
+    keys = [cache.slide_key(slide, theme, footer) for slide in slides]
+    parts = [cache.get(key) for key in keys]
+    missing = [index for index, part in enumerate(parts) if part is None]
+
+    for index in missing:
+        parts[index] = render_pdf(slides[index], title, theme, footer)
+        cache.put(keys[index], parts[index])
+    return merge_pdfs(parts, title)
@@ -0,0 +1,80 @@
+"""
+Circuit breaker: fechado -> aberto pela taxa de erro, aberto -> meio-aberto
+depois de `open_seconds`, e meio-aberto -> fechado (ou de volta a aberto)
+pela chamada de teste.
+"""
+
+import os
+import sys
+
+import pytest
+
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src  # noqa: F401 (põe o pacote shared no sys.path)
+from shared.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('shared.circuit_breaker.time.monotonic', lambda: now[0])
+    return now
+
+
+def open_breaker(clock):
+    breaker = CircuitBreaker('api.test', min_requests=4, error_threshold=0.5, open_seconds=30)
+    for ok in (True, False, True, False):
+        breaker.before_request()
+        breaker.record(ok, 0.1, error='HTTP 503')
+    return breaker
+
+
+def test_opens_on_error_rate(clock):
+    breaker = open_breaker(clock)
+    assert breaker.state == OPEN
+    clock[0] += 10
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_request()
+    assert excinfo.value.retry_after == pytest.approx(20)
+    assert breaker.snapshot()['rejected'] == 1
+
+
+def test_stays_closed_below_min_requests(clock):
+    breaker = CircuitBreaker('api.test', min_requests=4, error_threshold=0.5)
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 31
+    breaker.before_request()  # chamada de teste
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()  # só uma chamada de teste por vez
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    breaker.before_request()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 31
+    breaker.before_request()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_release_frees_the_probe(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 31
+    breaker.before_request()
+    breaker.release()
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
@@ -0,0 +1,137 @@
+"""
+Testes do cliente HTTP compartilhado contra um servidor local em 127.0.0.1:
+reaproveitamento de conexão, retry em 503, timeout de leitura e métricas.
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src  # noqa: F401 (põe o pacote shared no sys.path)
+from shared.circuit_breaker import CircuitOpenError
+from shared.http_client import HttpClient
+from shared.rate_budget import RateBudget
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.client_ports.add(self.client_address[1])
+            hits = server.hits[self.path]
+        if self.path == '/slow':
+            time.sleep(0.5)
+            self.reply(200, b'{"slow": true}')
+        elif self.path == '/flaky' and hits == 1:
+            self.reply(503, b'{"error": "indisponivel"}')
+        elif self.path == '/down':
+            self.reply(503, b'{"error": "indisponivel"}')
+        else:
+            self.reply(200, b'{"ok": true}')
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # cliente já desistiu (timeout)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits = {}
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(tmp_path):
+    budget = RateBudget(path=str(tmp_path / 'budget.db'), limits={})
+    client = HttpClient(connect_timeout=1, read_timeout=2, max_retries=2, backoff_factor=0, budget=budget)
+    yield client
+    client.session.close()
+
+
+def base_url(server):
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_reuses_connection(stub_server, client):
+    for _ in range(5):
+        assert client.get(base_url(stub_server) + '/ok').json() == {'ok': True}
+    assert stub_server.hits['/ok'] == 5
+    assert len(stub_server.client_ports) == 1
+
+
+def test_retries_503(stub_server, client):
+    response = client.get(base_url(stub_server) + '/flaky')
+    assert response.status_code == 200
+    assert stub_server.hits['/flaky'] == 2
+
+
+def test_gives_up_after_max_retries(stub_server, client):
+    response = client.get(base_url(stub_server) + '/down')
+    assert response.status_code == 503
+    assert stub_server.hits['/down'] == 3
+
+
+def test_read_timeout(stub_server, client):
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        # Timeout de leitura esgota os retries e vira ConnectionError (MaxRetryError)
+        client.get(base_url(stub_server) + '/slow', timeout=(1, 0.1))
+    assert time.monotonic() - start < 2
+
+
+def test_records_metrics(stub_server, client):
+    url = base_url(stub_server)
+    client.get(url + '/ok')
+    client.get(url + '/down')
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get(url + '/slow', timeout=(1, 0.1))
+
+    stats = client.metrics.snapshot()[f'127.0.0.1:{stub_server.server_address[1]}']
+    assert stats['requests'] == 3
+    assert stats['errors'] == 2
+    assert stats['last_status'] is None
+    assert stats['last_error'] == 'ConnectionError'
+    assert stats['max_ms'] >= stats['avg_ms'] > 0
+
+
+def test_open_circuit_does_not_spend_budget(stub_server, tmp_path):
+    upstream = f'127.0.0.1:{stub_server.server_address[1]}'
+    budget = RateBudget(path=str(tmp_path / 'budget.db'), limits={upstream: 10}, max_wait=0)
+    client = HttpClient(connect_timeout=1, read_timeout=2, max_retries=0, budget=budget)
+    client.get(base_url(stub_server) + '/ok')
+    client.breakers.get(upstream).trip(time.monotonic())
+
+    with pytest.raises(CircuitOpenError):
+        client.get(base_url(stub_server) + '/ok')
+
+    assert budget.snapshot()[upstream]['calls'] == 1
+    assert stub_server.hits['/ok'] == 1
+    client.session.close()
@@ -0,0 +1,70 @@
+"""
+Cache de PDFs: o teto de bytes vale para o total em disco, despejando os
+menos usados, inclusive com vários processos gravando no mesmo diretório.
+"""
+
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from src.services.pdf_cache import PdfCache
+except (ImportError, OSError):  # WeasyPrint ausente ou sem pango/cairo neste host
+    pytest.skip('WeasyPrint indisponível', allow_module_level=True)
+
+ENTRY = b'%PDF-' + b'x' * 995  # 1000 bytes
+
+
+def disk_bytes(directory):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(directory) for name in files if name.endswith('.pdf')
+    )
+
+
+def key(n):
+    return PdfCache.slide_key(f'# Slide {n}', 'default', '')
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=3000)
+    for n in range(3):
+        cache.put(key(n), ENTRY)
+    assert cache.get(key(0)) == ENTRY  # 0 passa a ser o mais recente
+    cache.put(key(3), ENTRY)
+
+    assert cache.get(key(1)) is None
+    assert all(cache.get(key(n)) == ENTRY for n in (0, 2, 3))
+    stats = cache.stats()
+    assert stats['bytes'] == disk_bytes(tmp_path) == 3000
+    assert stats['evictions'] == 1
+
+
+def test_oversized_entry_is_not_cached(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=500)
+    cache.put(key(0), ENTRY)
+    assert cache.get(key(0)) is None
+    assert disk_bytes(tmp_path) == 0
+
+
+def fill(directory, worker):
+    cache = PdfCache(directory, max_bytes=10_000)
+    for n in range(25):
+        cache.put(key(f'{worker}-{n}'), ENTRY)
+
+
+def test_cap_holds_across_processes(tmp_path):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=fill, args=(str(tmp_path), worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    assert all(process.exitcode == 0 for process in processes)
+    assert disk_bytes(tmp_path) <= 10_000
+    assert PdfCache(str(tmp_path), max_bytes=10_000).stats()['bytes'] == disk_bytes(tmp_path)
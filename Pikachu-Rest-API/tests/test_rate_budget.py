@@ -0,0 +1,69 @@
+"""
+Orçamento de chamadas (token bucket em SQLite): recusa quando esgota, recarrega
+com o tempo e vale para todos os processos que usam o mesmo arquivo.
+"""
+
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src  # noqa: F401 (põe o pacote shared no sys.path)
+from shared.rate_budget import RateBudget, RateBudgetExceeded
+
+UPSTREAM = 'api.nasa.gov'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr('shared.rate_budget.time.time', lambda: now[0])
+    return now
+
+
+def test_refused_when_exhausted(tmp_path, clock):
+    budget = RateBudget(path=str(tmp_path / 'budget.db'), limits={UPSTREAM: 2}, max_wait=0)
+    assert budget.try_acquire(UPSTREAM) == 0
+    assert budget.try_acquire(UPSTREAM) == 0
+    assert budget.try_acquire(UPSTREAM) == pytest.approx(1800)  # 2/h: próxima ficha em meia hora
+    with pytest.raises(RateBudgetExceeded) as excinfo:
+        budget.acquire(UPSTREAM)
+    assert excinfo.value.retry_after == pytest.approx(1800)
+    assert budget.snapshot()[UPSTREAM]['rejected'] == 2
+
+
+def test_refills_over_time(tmp_path, clock):
+    budget = RateBudget(path=str(tmp_path / 'budget.db'), limits={UPSTREAM: 2}, max_wait=0)
+    budget.try_acquire(UPSTREAM)
+    budget.try_acquire(UPSTREAM)
+    clock[0] += 1800
+    assert budget.try_acquire(UPSTREAM) == 0
+    assert budget.try_acquire(UPSTREAM) > 0
+
+
+def test_unlimited_upstream_is_free(tmp_path):
+    budget = RateBudget(path=str(tmp_path / 'budget.db'), limits={})
+    assert all(budget.try_acquire('pokeapi.co') == 0 for _ in range(100))
+
+
+def spend(path, attempts, results):
+    budget = RateBudget(path=path, limits={UPSTREAM: 30}, max_wait=0)
+    results.put(sum(1 for _ in range(attempts) if budget.try_acquire(UPSTREAM) == 0))
+
+
+def test_shared_across_processes(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [context.Process(target=spend, args=(path, 20, results)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    granted = sum(results.get(timeout=30) for _ in processes)
+    for process in processes:
+        process.join(10)
+    # 80 tentativas, 30 fichas por hora no arquivo compartilhado
+    assert granted == 30
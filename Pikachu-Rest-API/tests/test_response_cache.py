@@ -0,0 +1,93 @@
+"""
+Cache de respostas: single-flight nas perdas simultâneas, stale-while-revalidate
+e última resposta boa quando o upstream falha.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src  # noqa: F401 (põe o pacote shared no sys.path)
+from shared.response_cache import ResponseCache
+
+
+def test_concurrent_misses_call_upstream_once():
+    cache = ResponseCache()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {'ok': True}
+
+    with ThreadPoolExecutor(16) as pool:
+        futures = [pool.submit(cache.get_or_fetch, 'apod', fetch, 60) for _ in range(16)]
+        # Todos já passaram pelo lookup antes de o upstream responder
+        deadline = time.monotonic() + 2
+        while cache.stats()['coalesced'] < 15 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{'ok': True}] * 16
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['coalesced'] == 15
+
+
+def test_error_is_shared_by_waiters_and_not_cached():
+    cache = ResponseCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise ConnectionError('fora do ar')
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch('iss', fetch, 60)
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch('iss', fetch, 60)
+    assert len(calls) == 2
+
+
+def test_stale_value_served_while_refreshing(monkeypatch):
+    cache = ResponseCache()
+    now = [1000.0]
+    monkeypatch.setattr('shared.response_cache.time.time', lambda: now[0])
+    refreshed = threading.Event()
+
+    assert cache.get_or_fetch('moon', lambda: 'velho', 10, stale_for=10) == 'velho'
+    now[0] += 10  # próxima janela, ainda dentro do stale_for
+
+    def fetch():
+        refreshed.set()
+        return 'novo'
+
+    assert cache.get_or_fetch('moon', fetch, 10, stale_for=10) == 'velho'
+    assert refreshed.wait(2)
+    deadline = time.monotonic() + 2
+    while cache.stats()['inflight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_fetch('moon', fetch, 10, stale_for=10) == 'novo'
+
+
+def test_last_good_value_when_upstream_fails(monkeypatch):
+    cache = ResponseCache(last_good_for=3600)
+    now = [1000.0]
+    monkeypatch.setattr('shared.response_cache.time.time', lambda: now[0])
+    cache.get_or_fetch('people', lambda: ['astronauta'], 10)
+    now[0] += 60  # fora da janela e do stale_for
+
+    def fetch():
+        raise ConnectionError('fora do ar')
+
+    assert cache.get_or_fetch('people', fetch, 10) == ['astronauta']
+    assert cache.stats()['last_good'] == 1
@@ -1,3 +1,4 @@
+import os
 from flask import Flask
 from routes import setup_routes
 from database.BancoSqlite import BancoSqlite
@@ -26,7 +27,8 @@ class FlaskServerApp:
         # Setup routes with database connection
         setup_routes(self.app, self.db)
         # Run the Flask app
-        self.app.run(host=host, port=port, debug=True)
+        # Debug só quando pedido explicitamente (FLASK_DEBUG=1)
+        self.app.run(host=host, port=port, debug=os.environ.get('FLASK_DEBUG') == '1')
 
 if __name__ == "__main__":
     server = FlaskServerApp(db_name='./database/floricultura.db')
@@ -24,6 +24,7 @@ from datetime import datetime
 from src.database.models import db, User, Task, Project
 from src.backend.controllers import UserController, TaskController, ProjectController
 from src.api.routes import api_bp
+from src.backend.db_config import configure_database, init_database
 
 
 class RaichuWebServer:
@@ -45,12 +46,14 @@ class RaichuWebServer:
         """Configuração inicial da aplicação Flask"""
         # Configurações básicas
         self.app.config["SECRET_KEY"] = "raichu-secret-key-2025"
-        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:////home/ubuntu/RaichuWebServer/src/database/raichu.db"
+        # Banco SQLite com perfil de PRAGMAs/pool escolhido por DB_PROFILE
+        configure_database(self.app, "/home/ubuntu/RaichuWebServer/src/database/raichu.db")
         self.app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
         
-        # Configurações de desenvolvimento
-        self.app.config["DEBUG"] = True
-        self.app.config["TEMPLATES_AUTO_RELOAD"] = True
+        # Configurações de desenvolvimento (desligadas por padrão; FLASK_DEBUG=1 liga)
+        debug = os.environ.get("FLASK_DEBUG") == "1"
+        self.app.config["DEBUG"] = debug
+        self.app.config["TEMPLATES_AUTO_RELOAD"] = debug
         
         # Habilitar CORS para todas as rotas
         CORS(self.app, origins="*")
@@ -58,6 +61,7 @@ class RaichuWebServer:
     def setup_database(self):
         """Configuração e inicialização do banco de dados"""
         db.init_app(self.app)
+        init_database(self.app, db)
         
         with self.app.app_context():
             # Criar diretório do banco se não existir
@@ -270,8 +274,10 @@ class RaichuWebServer:
             db.session.rollback()
             return render_template('errors/500.html'), 500
     
-    def run(self, host='0.0.0.0', port=5000, debug=True):
-        """Executar o servidor"""
+    def run(self, host='0.0.0.0', port=5000, debug=None):
+        """Executar o servidor de desenvolvimento (em produção use gunicorn com create_app)"""
+        if debug is None:
+            debug = self.app.config["DEBUG"]
         print(f"🚀 RaichuWebServer iniciando em http://{host}:{port}")
         print("📊 Dashboards disponíveis:")
         print("   • Bootstrap: /framework/bootstrap")
@@ -284,6 +290,11 @@ class RaichuWebServer:
         self.app.run(host=host, port=port, debug=debug)
 
 
+def create_app():
+    """Application factory para servidores WSGI (ex.: gunicorn 'raichu_web_server:create_app()')"""
+    return RaichuWebServer().app
+
+
 def main():
     """Função principal para executar o servidor"""
     server = RaichuWebServer()
@@ -1,36 +1,52 @@
 import os
-from flask import Flask, jsonify, request, send_from_directory
+import sys
+import time
+import atexit
+import base64
+import binascii
+import threading
+from flask import Blueprint, Flask, current_app, jsonify, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy import case, func, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Raiz do repositório no sys.path: pacote `shared/`, comum aos apps
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from shared.conditional import ConditionalGet
+from shared.db_config import configure_database, init_database
+from shared.static_files import StaticManifest
 
 # --- Configuração ---
 
 # Obter o caminho absoluto para o diretório do backend
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-app = Flask(__name__,
-            static_folder='../frontend/dist', # Pasta dos arquivos estáticos do React
-            template_folder='../frontend/dist') # Pasta do index.html do React
-
-# Configuração do CORS para permitir requisições do frontend em desenvolvimento
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
+DEFAULT_CONFIG = {
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    # Paginação da listagem de tarefas (keyset em Task.id)
+    'TASKS_PAGE_SIZE': 100,
+    'TASKS_MAX_PAGE_SIZE': 500,
+    # Limite de itens aceitos por requisição em /api/tasks/bulk
+    'TASKS_BULK_MAX_ITEMS': 5000,
+    # Cache em memória de /api/stats, válido enquanto a versão de sincronização não mudar
+    'STATS_CACHE_ENABLED': True,
+    # Intervalo (s) para gravar os incrementos pomodoro acumulados (0 grava na hora)
+    'POMODORO_FLUSH_INTERVAL': 2.0,
+}
 
-# Configuração do Banco de Dados SQLite
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'instance', 'app.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Criar pasta 'instance' se não existir
-instance_path = os.path.join(basedir, 'instance')
-if not os.path.exists(instance_path):
-    os.makedirs(instance_path)
-
-db = SQLAlchemy(app)
+db = SQLAlchemy()
+api_bp = Blueprint('api', __name__)
 
 # --- Modelos do Banco de Dados ---
 
 class Category(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=0, index=True) # Versão da última alteração
     tasks = db.relationship('Task', backref='category', lazy=True, cascade="all, delete-orphan")
 
     def to_dict(self):
@@ -42,6 +58,15 @@ class Task(db.Model):
     completed = db.Column(db.Boolean, default=False)
     pomodoro_time_spent = db.Column(db.Integer, default=0) # Tempo em segundos
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=0, index=True) # Versão da última alteração
+
+    # Índices compostos terminados em id: servem os filtros da listagem e
+    # mantêm a ordenação do cursor sem etapa extra de ordenação
+    __table_args__ = (
+        db.Index('ix_task_category_id_id', 'category_id', 'id'),
+        db.Index('ix_task_completed_id', 'completed', 'id'),
+        db.Index('ix_task_category_id_completed_id', 'category_id', 'completed', 'id'),
+    )
 
     def to_dict(self):
         return {
@@ -53,16 +78,81 @@ class Task(db.Model):
             "category_name": self.category.name if self.category else "N/A"
         }
 
+    @staticmethod
+    def list_query():
+        """Projeção das colunas de listagem já com o nome da categoria.
+
+        Um único SELECT com JOIN, sem montar objetos ORM: evita o SELECT
+        extra por tarefa que o lazy load de `self.category` dispara.
+        """
+        return db.session.query(
+            Task.id,
+            Task.title,
+            Task.completed,
+            Task.pomodoro_time_spent,
+            Task.category_id,
+            Category.name.label('category_name'),
+        ).outerjoin(Category, Task.category_id == Category.id)
+
+    @staticmethod
+    def row_to_dict(row):
+        """Serializa uma linha de `list_query` no mesmo formato de `to_dict`"""
+        return {
+            "id": row.id,
+            "title": row.title,
+            "completed": row.completed,
+            "pomodoro_time_spent": row.pomodoro_time_spent,
+            "category_id": row.category_id,
+            "category_name": row.category_name if row.category_name is not None else "N/A"
+        }
+
+class SyncState(db.Model):
+    """Contador global de versões de mudança (linha única, id=1)"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class Tombstone(db.Model):
+    """Registro de remoção para que clientes em sincronia apaguem a linha"""
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.Integer, nullable=False, index=True)
+
+# --- Versionamento de mudanças ---
+
+def next_version():
+    """Reserva a próxima versão dentro da transação atual.
+
+    O UPDATE no contador pega o lock de escrita do SQLite, então as versões
+    ficam na mesma ordem dos commits e nunca se repetem.
+    """
+    version = db.session.execute(
+        db.update(SyncState)
+        .where(SyncState.id == 1)
+        .values(version=SyncState.version + 1)
+        .returning(SyncState.version)
+    ).scalar()
+    if version is None:
+        db.session.add(SyncState(id=1, version=1))
+        db.session.flush()
+        version = 1
+    return version
+
+def current_version():
+    """Última versão confirmada; 0 se nada foi escrito ainda"""
+    version = db.session.scalar(db.select(SyncState.version).where(SyncState.id == 1))
+    return version or 0
+
 # --- Rotas da API ---
 
 # API: Obter todas as categorias
-@app.route('/api/categories', methods=['GET'])
+@api_bp.route('/categories', methods=['GET'])
 def get_categories():
     categories = Category.query.all()
     return jsonify([category.to_dict() for category in categories])
 
 # API: Criar uma nova categoria
-@app.route('/api/categories', methods=['POST'])
+@api_bp.route('/categories', methods=['POST'])
 def create_category():
     data = request.get_json()
     if not data or not 'name' in data or not data['name'].strip():
@@ -72,19 +162,89 @@ def create_category():
     if existing_category:
         return jsonify({"error": "Categoria já existe"}), 409
 
-    new_category = Category(name=data['name'])
+    new_category = Category(name=data['name'], version=next_version())
     db.session.add(new_category)
     db.session.commit()
     return jsonify(new_category.to_dict()), 201
 
-# API: Obter todas as tarefas
-@app.route('/api/tasks', methods=['GET'])
+# --- Paginação por cursor ---
+
+def encode_cursor(task_id):
+    """Gera o token opaco que aponta para depois da tarefa informada"""
+    return base64.urlsafe_b64encode(str(task_id).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Recupera o id da tarefa a partir do token; None se for inválido"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+def parse_limit(value, default):
+    """Tamanho de página da query string; None se não for um inteiro positivo"""
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        return None
+    return limit if limit >= 1 else None
+
+def parse_bool(value):
+    """Converte 'true'/'false'/'1'/'0' da query string; None se inválido"""
+    normalized = value.strip().lower()
+    if normalized in ('true', '1', 'yes'):
+        return True
+    if normalized in ('false', '0', 'no'):
+        return False
+    return None
+
+# API: Listar tarefas (paginado por cursor, com filtros opcionais)
+# Parâmetros: limit, after (cursor), category_id, completed
+@api_bp.route('/tasks', methods=['GET'])
 def get_tasks():
-    tasks = Task.query.all()
-    return jsonify([task.to_dict() for task in tasks])
+    version = current_version()
+    max_limit = current_app.config['TASKS_MAX_PAGE_SIZE']
+    limit = parse_limit(request.args.get('limit'), current_app.config['TASKS_PAGE_SIZE'])
+    if limit is None:
+        return jsonify({"error": "limit deve ser um inteiro positivo"}), 400
+    limit = min(limit, max_limit)
+
+    query = Task.list_query()
+
+    after = request.args.get('after')
+    if after:
+        after_id = decode_cursor(after)
+        if after_id is None:
+            return jsonify({"error": "Cursor inválido"}), 400
+        query = query.filter(Task.id > after_id)
+
+    if 'category_id' in request.args:
+        category_id = request.args.get('category_id', type=int)
+        if category_id is None:
+            return jsonify({"error": "category_id deve ser um inteiro"}), 400
+        query = query.filter(Task.category_id == category_id)
+
+    if 'completed' in request.args:
+        completed = parse_bool(request.args['completed'])
+        if completed is None:
+            return jsonify({"error": "completed deve ser true ou false"}), 400
+        query = query.filter(Task.completed == completed)
+
+    # Busca um item a mais só para saber se existe próxima página
+    rows = query.order_by(Task.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        "tasks": [Task.row_to_dict(row) for row in rows],
+        "next_cursor": encode_cursor(rows[-1].id) if has_more else None,
+        "version": version
+    })
 
 # API: Criar uma nova tarefa
-@app.route('/api/tasks', methods=['POST'])
+@api_bp.route('/tasks', methods=['POST'])
 def create_task():
     data = request.get_json()
     if not data or not 'title' in data or not 'category_id' in data:
@@ -94,13 +254,13 @@ def create_task():
     if not category:
         return jsonify({"error": "Categoria não encontrada"}), 404
 
-    new_task = Task(title=data['title'], category_id=data['category_id'])
+    new_task = Task(title=data['title'], category_id=data['category_id'], version=next_version())
     db.session.add(new_task)
     db.session.commit()
     return jsonify(new_task.to_dict()), 201
 
 # API: Atualizar uma tarefa (status, tempo pomodoro)
-@app.route('/api/tasks/<int:task_id>', methods=['PUT'])
+@api_bp.route('/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
     task = Task.query.get_or_404(task_id)
     data = request.get_json()
@@ -111,38 +271,459 @@ def update_task(task_id):
     if 'pomodoro_time_spent' in data:
         task.pomodoro_time_spent = data['pomodoro_time_spent']
 
+    task.version = next_version()
     db.session.commit()
     return jsonify(task.to_dict())
 
 # API: Deletar uma tarefa
-@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@api_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     task = Task.query.get_or_404(task_id)
+    db.session.add(Tombstone(entity='task', entity_id=task.id, version=next_version()))
     db.session.delete(task)
     db.session.commit()
     return jsonify({"success": True, "message": "Tarefa deletada"})
 
-# --- Rota para servir o App React ---
-# Esta rota serve o index.html principal do React para qualquer rota que não seja da API.
-# Isso permite que o React controle a navegação no frontend.
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
+# --- Operações em lote ---
+
+BULK_UPDATABLE_FIELDS = ('title', 'completed', 'pomodoro_time_spent', 'category_id')
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def validate_bulk_create(item, existing_categories):
+    """Valida um item de criação; retorna (linha, erro)"""
+    if not isinstance(item, dict):
+        return None, "Item deve ser um objeto"
+    title = item.get('title')
+    if not isinstance(title, str) or not title.strip():
+        return None, "Título é obrigatório"
+    if not is_int(item.get('category_id')):
+        return None, "ID da categoria é obrigatório"
+    if item['category_id'] not in existing_categories:
+        return None, "Categoria não encontrada"
+    completed = item.get('completed', False)
+    if not isinstance(completed, bool):
+        return None, "completed deve ser booleano"
+    time_spent = item.get('pomodoro_time_spent', 0)
+    if not is_int(time_spent) or time_spent < 0:
+        return None, "pomodoro_time_spent deve ser um inteiro não negativo"
+    return {
+        "title": title,
+        "category_id": item['category_id'],
+        "completed": completed,
+        "pomodoro_time_spent": time_spent,
+    }, None
+
+def validate_bulk_update(item, existing_tasks, existing_categories):
+    """Valida uma atualização parcial; retorna (linha, erro)"""
+    if not isinstance(item, dict):
+        return None, "Item deve ser um objeto"
+    if not is_int(item.get('id')):
+        return None, "ID da tarefa é obrigatório"
+    if item['id'] not in existing_tasks:
+        return None, "Tarefa não encontrada"
+    row = {"id": item['id']}
+    for field in BULK_UPDATABLE_FIELDS:
+        if field in item:
+            row[field] = item[field]
+    if len(row) == 1:
+        return None, "Nenhum campo para atualizar"
+    if 'title' in row and (not isinstance(row['title'], str) or not row['title'].strip()):
+        return None, "Título inválido"
+    if 'completed' in row and not isinstance(row['completed'], bool):
+        return None, "completed deve ser booleano"
+    if 'pomodoro_time_spent' in row and (not is_int(row['pomodoro_time_spent']) or row['pomodoro_time_spent'] < 0):
+        return None, "pomodoro_time_spent deve ser um inteiro não negativo"
+    if 'category_id' in row and row['category_id'] not in existing_categories:
+        return None, "Categoria não encontrada"
+    return row, None
+
+# API: Criar, atualizar e deletar tarefas em lote
+# Corpo: {"create": [...], "update": [...], "delete": [ids]}
+# Tudo é validado antes de escrever e aplicado em uma única transação:
+# ou o lote inteiro entra, ou nada entra.
+@api_bp.route('/tasks/bulk', methods=['POST'])
+def bulk_tasks():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Corpo JSON é obrigatório"}), 400
+
+    creates = data.get('create', [])
+    updates = data.get('update', [])
+    deletes = data.get('delete', [])
+    if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+        return jsonify({"error": "create, update e delete devem ser listas"}), 400
+
+    total = len(creates) + len(updates) + len(deletes)
+    if total == 0:
+        return jsonify({"error": "Lote vazio"}), 400
+    if total > current_app.config['TASKS_BULK_MAX_ITEMS']:
+        return jsonify({"error": f"Lote excede {current_app.config['TASKS_BULK_MAX_ITEMS']} itens"}), 413
+
+    # Carrega de uma vez todos os ids referenciados pelo lote
+    category_ids = {item.get('category_id') for item in creates + updates
+                    if isinstance(item, dict) and is_int(item.get('category_id'))}
+    task_ids = {item.get('id') for item in updates if isinstance(item, dict) and is_int(item.get('id'))}
+    task_ids.update(task_id for task_id in deletes if is_int(task_id))
+
+    existing_categories = set()
+    if category_ids:
+        existing_categories = set(db.session.scalars(
+            db.select(Category.id).where(Category.id.in_(category_ids))))
+    existing_tasks = set()
+    if task_ids:
+        existing_tasks = set(db.session.scalars(
+            db.select(Task.id).where(Task.id.in_(task_ids))))
+
+    results = {"create": [], "update": [], "delete": []}
+    create_rows, update_rows, delete_ids = [], [], []
+    has_errors = False
+
+    for index, item in enumerate(creates):
+        row, error = validate_bulk_create(item, existing_categories)
+        results['create'].append({"index": index, "ok": error is None, "error": error})
+        if error:
+            has_errors = True
+        else:
+            create_rows.append(row)
+
+    delete_set = {task_id for task_id in deletes if is_int(task_id)}
+    for index, item in enumerate(updates):
+        row, error = validate_bulk_update(item, existing_tasks, existing_categories)
+        if not error and row['id'] in delete_set:
+            error = "Tarefa também está na lista de remoção"
+        results['update'].append({"index": index, "ok": error is None, "id": item.get('id') if isinstance(item, dict) else None, "error": error})
+        if error:
+            has_errors = True
+        else:
+            update_rows.append(row)
+
+    for index, task_id in enumerate(deletes):
+        error = None
+        if not is_int(task_id):
+            error = "ID da tarefa deve ser inteiro"
+        elif task_id not in existing_tasks:
+            error = "Tarefa não encontrada"
+        results['delete'].append({"index": index, "ok": error is None, "id": task_id, "error": error})
+        if error:
+            has_errors = True
+        else:
+            delete_ids.append(task_id)
+
+    if has_errors:
+        return jsonify({"error": "Lote inválido, nenhuma alteração aplicada", "results": results}), 400
+
+    try:
+        version = next_version()
+        if create_rows:
+            for row in create_rows:
+                row['version'] = version
+            new_ids = db.session.scalars(
+                db.insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                create_rows).all()
+            for result, new_id in zip(results['create'], new_ids):
+                result['id'] = new_id
+        if update_rows:
+            for row in update_rows:
+                row['version'] = version
+            # UPDATE em lote por chave primária (executemany)
+            db.session.execute(db.update(Task), update_rows)
+        if delete_ids:
+            db.session.execute(db.insert(Tombstone), [
+                {"entity": "task", "entity_id": task_id, "version": version}
+                for task_id in delete_ids
+            ])
+            db.session.execute(db.delete(Task).where(Task.id.in_(delete_ids)))
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Falha ao aplicar o lote: {e}"}), 500
+
+    return jsonify({"success": True, "results": results})
+
+# --- Incrementos de tempo pomodoro ---
+
+class PomodoroBuffer:
+    """Acumula incrementos de pomodoro por tarefa e os grava em lote.
+
+    Vários timers somando na mesma tarefa viram uma única linha no próximo
+    flush, e cada flush é uma transação só, com UPDATE atômico
+    (coluna = coluna + ?) para não perder incrementos concorrentes.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.flush)
+
+    def add(self, task_id, seconds):
+        with self.lock:
+            self.pending[task_id] = self.pending.get(task_id, 0) + seconds
+            self.ensure_started()
+            return self.pending[task_id]
+
+    def ensure_started(self):
+        # Iniciada sob demanda para funcionar também em workers após fork
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name='pomodoro-flush', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.app.config['POMODORO_FLUSH_INTERVAL'] or 1.0)
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending or self.app is None:
+            return
+        with self.app.app_context():
+            try:
+                apply_pomodoro_increments(pending)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                # Devolve ao buffer para a próxima tentativa
+                with self.lock:
+                    for task_id, seconds in pending.items():
+                        self.pending[task_id] = self.pending.get(task_id, 0) + seconds
+                self.app.logger.warning("Falha ao gravar incrementos pomodoro: %s", e)
+
+pomodoro_buffer = PomodoroBuffer()
+
+def apply_pomodoro_increments(increments):
+    """Soma {task_id: segundos} em uma transação; tarefas removidas são ignoradas"""
+    version = next_version()
+    task_table = Task.__table__
+    db.session.execute(
+        task_table.update()
+        .where(task_table.c.id == db.bindparam('task_id'))
+        .values(pomodoro_time_spent=task_table.c.pomodoro_time_spent + db.bindparam('seconds'),
+                version=version),
+        [{"task_id": task_id, "seconds": seconds} for task_id, seconds in increments.items()]
+    )
+    db.session.commit()
+
+# API: Somar tempo pomodoro a uma tarefa
+# Corpo: {"seconds": 1500}
+@api_bp.route('/tasks/<int:task_id>/pomodoro', methods=['POST'])
+def add_pomodoro_time(task_id):
+    data = request.get_json(silent=True) or {}
+    seconds = data.get('seconds')
+    if not is_int(seconds) or seconds <= 0:
+        return jsonify({"error": "seconds deve ser um inteiro positivo"}), 400
+
+    if db.session.scalar(db.select(Task.id).where(Task.id == task_id)) is None:
+        return jsonify({"error": "Tarefa não encontrada"}), 404
+
+    if current_app.config['POMODORO_FLUSH_INTERVAL'] > 0:
+        pending = pomodoro_buffer.add(task_id, seconds)
+        return jsonify({"success": True, "id": task_id, "pending_seconds": pending}), 202
+
+    version = next_version()
+    time_spent = db.session.execute(
+        db.update(Task)
+        .where(Task.id == task_id)
+        .values(pomodoro_time_spent=Task.pomodoro_time_spent + seconds, version=version)
+        .returning(Task.pomodoro_time_spent)
+    ).scalar()
+    db.session.commit()
+    if time_spent is None:
+        return jsonify({"error": "Tarefa não encontrada"}), 404
+    return jsonify({"success": True, "id": task_id, "pomodoro_time_spent": time_spent})
+
+# --- Estatísticas do dashboard ---
+
+# Cache em memória do último resultado de /api/stats, marcado com a versão
+# de sincronização em que foi calculado. Qualquer escrita avança a versão e
+# invalida a entrada, inclusive escritas feitas por outros processos.
+stats_cache = {"version": None, "data": None}
+stats_cache_lock = threading.Lock()
+
+def completion_ratio(completed, total):
+    return round(completed / total, 4) if total else 0.0
+
+def compute_stats():
+    """Agrega contagens e tempo pomodoro por categoria com GROUP BY"""
+    rows = db.session.query(
+        Category.id,
+        Category.name,
+        func.count(Task.id),
+        func.coalesce(func.sum(case((Task.completed.is_(True), 1), else_=0)), 0),
+        func.coalesce(func.sum(Task.pomodoro_time_spent), 0),
+    ).outerjoin(Task, Task.category_id == Category.id) \
+     .group_by(Category.id, Category.name) \
+     .order_by(Category.id).all()
+
+    categories = [{
+        "id": category_id,
+        "name": name,
+        "total_tasks": total,
+        "completed_tasks": completed,
+        "completion_ratio": completion_ratio(completed, total),
+        "pomodoro_time_spent": time_spent,
+    } for category_id, name, total, completed, time_spent in rows]
+
+    total_tasks = sum(c["total_tasks"] for c in categories)
+    completed_tasks = sum(c["completed_tasks"] for c in categories)
+    return {
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks,
+        "completion_ratio": completion_ratio(completed_tasks, total_tasks),
+        "pomodoro_time_spent": sum(c["pomodoro_time_spent"] for c in categories),
+        "categories": categories,
+    }
+
+# API: Estatísticas agregadas para o dashboard
+@api_bp.route('/stats', methods=['GET'])
+def get_stats():
+    if not current_app.config['STATS_CACHE_ENABLED']:
+        return jsonify(compute_stats())
+
+    version = current_version()
+    with stats_cache_lock:
+        if stats_cache["version"] == version:
+            return jsonify(stats_cache["data"])
+
+    data = compute_stats()
+    with stats_cache_lock:
+        stats_cache["version"] = version
+        stats_cache["data"] = data
+    return jsonify(data)
+
+# --- Sincronização incremental ---
+
+# API: Mudanças desde uma versão conhecida pelo cliente
+# Retorna apenas as linhas alteradas/criadas e os ids removidos depois de `since`;
+# sem `since` (ou com 0) devolve o estado completo, para um cliente novo
+@api_bp.route('/sync', methods=['GET'])
+def sync():
+    since = request.args.get('since', 0, type=int)
+    if since is None or since < 0:
+        return jsonify({"error": "since deve ser um inteiro não negativo"}), 400
+
+    # Lida antes das mudanças: o que for gravado no meio volta no próximo sync
+    version = current_version()
+
+    if since == 0:
+        # Snapshot: linhas antigas (ou migradas) podem ter versão 0
+        tasks = Task.list_query().order_by(Task.id).all()
+        categories = Category.query.order_by(Category.id).all()
+        deleted_tasks = []
     else:
-        return send_from_directory(app.template_folder, 'index.html')
+        tasks = Task.list_query().filter(Task.version > since).order_by(Task.id).all()
+        categories = Category.query.filter(Category.version > since).order_by(Category.id).all()
+        deleted_tasks = db.session.scalars(
+            db.select(Tombstone.entity_id)
+            .where(Tombstone.entity == 'task', Tombstone.version > since)
+            .order_by(Tombstone.version)
+        ).all()
 
+    return jsonify({
+        "version": version,
+        "tasks": [Task.row_to_dict(row) for row in tasks],
+        "categories": [category.to_dict() for category in categories],
+        "deleted": {"tasks": deleted_tasks}
+    })
+
+# --- GET condicional ---
+
+def categories_version():
+    """Versão da tabela de categorias (MAX sobre coluna indexada)"""
+    return db.session.scalar(db.select(func.max(Category.version))) or 0
+
+# Respostas com If-None-Match atual voltam 304 sem consultar as tabelas
+conditional = ConditionalGet(api_bp)
+conditional.track('get_tasks', current_version)
+conditional.track('get_categories', categories_version)
+conditional.track('get_stats', current_version)
+conditional.track('sync', current_version)
+
+# --- Criação da aplicação ---
+
+def upgrade_schema():
+    """Leva bancos criados por versões anteriores ao esquema atual.
+
+    `create_all` só cria as tabelas que faltam; colunas `version` e índices
+    novos em tabelas que já existem são criados aqui, de forma idempotente.
+    """
+    with db.engine.begin() as conn:
+        for table in (Category.__table__, Task.__table__):
+            columns = {column['name'] for column in inspect(conn).get_columns(table.name)}
+            if 'version' not in columns:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN version INTEGER NOT NULL DEFAULT 0'))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+def seed_database():
+    """Cria as tabelas e os dados mínimos, se ainda não existirem"""
+    db.create_all()
+    upgrade_schema()
+    # Garante a linha do contador de versões de sincronização
+    if not db.session.get(SyncState, 1):
+        db.session.add(SyncState(id=1, version=0))
+        db.session.commit()
+    # Cria uma categoria 'Geral' se nenhuma existir
+    if not Category.query.first():
+        default_category = Category(name='Geral', version=next_version())
+        db.session.add(default_category)
+        db.session.commit()
+
+def create_app(config=None):
+    """Application factory: cada chamada monta um app novo e configurado"""
+    app = Flask(__name__,
+                static_folder='../frontend/dist', # Pasta dos arquivos estáticos do React
+                template_folder='../frontend/dist') # Pasta do index.html do React
+
+    # Configuração do CORS para permitir requisições do frontend em desenvolvimento
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
+
+    # Configuração do Banco de Dados SQLite (perfil escolhido por DB_PROFILE)
+    configure_database(app, os.path.join(basedir, 'instance', 'app.db'))
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(config or {})
+
+    # Criar pasta 'instance' se não existir
+    instance_path = os.path.join(basedir, 'instance')
+    if not os.path.exists(instance_path):
+        os.makedirs(instance_path)
+
+    db.init_app(app)
+    init_database(app, db)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    pomodoro_buffer.init_app(app)
+
+    # --- Rota para servir o App React ---
+    # Esta rota serve o index.html principal do React para qualquer rota que não seja da API.
+    # Isso permite que o React controle a navegação no frontend.
+    # O build é indexado em memória na inicialização, com variantes gzip/brotli
+    # e cache longo para os arquivos com hash no nome.
+    static_manifest = StaticManifest(app.static_folder)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        response = static_manifest.serve(path)
+        if response is None:
+            return "index.html not found", 404
+        return response
 
-# --- Execução ---
-if __name__ == '__main__':
     with app.app_context():
-        # Cria as tabelas do banco de dados se não existirem
-        db.create_all()
-        # Cria uma categoria 'Geral' se nenhuma existir
-        if not Category.query.first():
-            default_category = Category(name='Geral')
-            db.session.add(default_category)
-            db.session.commit()
-            
-    app.run(debug=True, port=5000)
+        seed_database()
+        # Nenhuma conexão aberta pode ser herdada pelos workers após o fork
+        db.engine.dispose()
+
+    return app
+
+
+# --- Execução (servidor de desenvolvimento) ---
+# Em produção use `python serve.py`, que sobe vários workers com gunicorn.
+if __name__ == '__main__':
+    app = create_app()
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5000)
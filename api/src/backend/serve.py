@@ -0,0 +1,23 @@
+"""
+Servidor de produção do backend do TodoApp (gunicorn; opções e recarga de
+código em `shared/serve.py`).
+
+Uso:
+    python serve.py                          # workers = 2 * CPUs + 1
+    python serve.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+
+O `python main.py` continua disponível apenas para desenvolvimento.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+# Raiz do repositório: pacote `shared/`, comum aos apps
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(BACKEND_DIR))))
+
+from shared.serve import main
+
+if __name__ == '__main__':
+    main(default_app='main:create_app')
@@ -0,0 +1,39 @@
+"""
+`GET /api/sync`: sem `since` o cliente recebe o estado completo; com a
+versão que já conhece, só o que mudou depois dela.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'sync.db'}")
+    from main import create_app
+    return create_app({'TESTING': True, 'POMODORO_FLUSH_INTERVAL': 0}).test_client()
+
+
+def test_full_snapshot_includes_seeded_category(client):
+    for url in ('/api/sync', '/api/sync?since=0'):
+        data = client.get(url).get_json()
+        assert [category['name'] for category in data['categories']] == ['Geral']
+        assert data['version'] >= 1
+
+
+def test_incremental_sync(client):
+    version = client.get('/api/sync').get_json()['version']
+    task = client.post('/api/tasks', json={'title': 'Nova', 'category_id': 1}).get_json()
+
+    data = client.get(f'/api/sync?since={version}').get_json()
+    assert [row['id'] for row in data['tasks']] == [task['id']]
+    assert data['categories'] == []
+
+    client.delete(f"/api/tasks/{task['id']}")
+    data = client.get(f"/api/sync?since={data['version']}").get_json()
+    assert data['tasks'] == []
+    assert data['deleted']['tasks'] == [task['id']]
@@ -0,0 +1,64 @@
+"""
+Regressão de N+1 em `GET /api/tasks`: o número de consultas SQL da listagem
+não pode crescer com a quantidade de tarefas.
+"""
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Número de consultas da listagem: versão no ConditionalGet, versão no handler e a consulta da página
+EXPECTED_QUERIES = 3
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'tasks.db'}")
+    from main import create_app
+    return create_app({'TESTING': True, 'POMODORO_FLUSH_INTERVAL': 0})
+
+
+def seed_tasks(app, count, prefix):
+    from main import Category, Task, db
+    with app.app_context():
+        categories = [Category(name=f'{prefix} {i}') for i in range(5)]
+        db.session.add_all(categories)
+        db.session.flush()
+        db.session.add_all(
+            Task(title=f'{prefix} tarefa {i}', completed=i % 3 == 0, category_id=categories[i % len(categories)].id)
+            for i in range(count)
+        )
+        db.session.commit()
+
+
+def count_queries(app, url):
+    from main import db
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = app.test_client().get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+    return response, statements
+
+
+def test_task_list_query_count_is_constant(app):
+    seed_tasks(app, 10, 'Poucas')
+    _, few = count_queries(app, '/api/tasks?limit=500')
+
+    seed_tasks(app, 200, 'Muitas')
+    response, many = count_queries(app, '/api/tasks?limit=500')
+
+    assert len(response.get_json()['tasks']) == 210
+    assert len(few) == len(many) == EXPECTED_QUERIES, many
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Raiz do repositório no sys.path: pacote `shared/`, comum aos apps
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
@@ -1,46 +1,96 @@
 from flask import Blueprint, jsonify
 import requests
 from datetime import datetime
+import math
 import os
 
+from shared.circuit_breaker import CircuitOpenError
+from shared.http_client import http_client
+from shared.pokemon_cache import PokemonCache, pokemon_cache
+from shared.rate_budget import RateBudgetExceeded
+from shared.response_cache import DAY, HOUR, response_cache
+
 astro_bp = Blueprint('astro', __name__)
 
 # NASA API Key - você pode obter uma em https://api.nasa.gov/
 NASA_API_KEY = os.environ.get('NASA_API_KEY', 'DEMO_KEY')
 
+# Janela de cache (segundos) de cada endpoint e por quanto tempo a resposta
+# anterior ainda é servida enquanto a nova é buscada
+ISS_WINDOW = int(os.environ.get('ISS_CACHE_WINDOW', 5))
+CACHE_POLICIES = {
+    'apod': (DAY, HOUR),
+    'horoscope': (DAY, HOUR),
+    'moon-phase': (DAY, HOUR),
+    'people-in-space': (HOUR, HOUR),
+    'iss-location': (ISS_WINDOW, ISS_WINDOW),
+}
+
+def retry_after(e):
+    """Segundos para o Retry-After se a falha for circuito aberto ou orçamento esgotado (também encadeados)"""
+    while e is not None:
+        if isinstance(e, (CircuitOpenError, RateBudgetExceeded)):
+            return max(math.ceil(min(e.retry_after or 1, HOUR)), 1)
+        e = getattr(e, '__cause__', None)
+    return None
+
+def error_response(e):
+    """Upstream indisponível por decisão nossa vira 503 com Retry-After; o resto, 500"""
+    seconds = retry_after(e)
+    if seconds is not None:
+        return jsonify({"error": str(e)}), 503, {'Retry-After': str(seconds)}
+    return jsonify({"error": str(e)}), 500
+
+def cached(name, fetch, key=None):
+    """Resposta de `fetch` pelo cache de janela de tempo do endpoint `name`"""
+    window, stale_for = CACHE_POLICIES[name]
+    return response_cache.get_or_fetch(key or name, fetch, window, stale_for)
+
+def fetch_apod():
+    url = f"https://api.nasa.gov/planetary/apod?api_key={NASA_API_KEY}"
+    response = http_client.get(url)
+    response.raise_for_status()
+    return response.json()
+
 @astro_bp.route('/nasa/apod', methods=['GET'])
 def get_nasa_apod():
     """Obtém a Foto Astronômica do Dia da NASA"""
     try:
-        url = f"https://api.nasa.gov/planetary/apod?api_key={NASA_API_KEY}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached('apod', fetch_apod))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def simplify_pokemon(data):
+    """Reduz a resposta da PokeAPI aos campos usados pelo frontend"""
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "height": data["height"],
+        "weight": data["weight"],
+        "types": [type_info["type"]["name"] for type_info in data["types"]],
+        "abilities": [ability["ability"]["name"] for ability in data["abilities"]],
+        "sprite": data["sprites"]["front_default"]
+    }
+
+def fetch_pokemon(identifier):
+    """Busca um Pokémon por nome ou ID, passando primeiro pelo cache"""
+    hit = pokemon_cache.get(identifier)
+    if hit is not None:
+        return hit
+    url = f"https://pokeapi.co/api/v2/pokemon/{PokemonCache.normalize(identifier)}"
+    response = http_client.get(url)
+    response.raise_for_status()
+    simplified_data = simplify_pokemon(response.json())
+    pokemon_cache.put(simplified_data)
+    return simplified_data
 
 @astro_bp.route('/pokemon/<pokemon_name>', methods=['GET'])
 def get_pokemon(pokemon_name):
     """Obtém informações de um Pokémon específico"""
     try:
-        url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Simplificando os dados retornados
-        simplified_data = {
-            "id": data["id"],
-            "name": data["name"],
-            "height": data["height"],
-            "weight": data["weight"],
-            "types": [type_info["type"]["name"] for type_info in data["types"]],
-            "abilities": [ability["ability"]["name"] for ability in data["abilities"]],
-            "sprite": data["sprites"]["front_default"]
-        }
-        return jsonify(simplified_data)
+        return jsonify(fetch_pokemon(pokemon_name))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @astro_bp.route('/pokemon/random', methods=['GET'])
 def get_random_pokemon():
@@ -48,78 +98,104 @@ def get_random_pokemon():
     try:
         import random
         pokemon_id = random.randint(1, 1010)  # Existem cerca de 1010 Pokémon
-        url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        simplified_data = {
-            "id": data["id"],
-            "name": data["name"],
-            "height": data["height"],
-            "weight": data["weight"],
-            "types": [type_info["type"]["name"] for type_info in data["types"]],
-            "abilities": [ability["ability"]["name"] for ability in data["abilities"]],
-            "sprite": data["sprites"]["front_default"]
-        }
-        return jsonify(simplified_data)
+        return jsonify(fetch_pokemon(pokemon_id))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_horoscope(sign):
+    # Usando uma API de horóscopo gratuita
+    url = f"https://horoscope-app-api.vercel.app/api/v1/get-horoscope/daily?sign={sign}&day=today"
+    response = http_client.get(url)
+    response.raise_for_status()
+    return response.json()
 
 @astro_bp.route('/horoscope/<sign>', methods=['GET'])
 def get_horoscope(sign):
     """Obtém o horóscopo do dia para um signo específico"""
     try:
-        # Usando uma API de horóscopo gratuita
-        url = f"https://horoscope-app-api.vercel.app/api/v1/get-horoscope/daily?sign={sign}&day=today"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        sign = sign.lower()
+        return jsonify(cached('horoscope', lambda: fetch_horoscope(sign), key=f'horoscope:{sign}'))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_moon_phase():
+    # Usando uma API gratuita para fases da lua
+    url = "https://api.farmsense.net/v1/moonphases/"
+    response = http_client.get(url)
+    response.raise_for_status()
+    data = response.json()
+
+    # Pega a fase mais recente
+    if not data:
+        return None
+    latest_phase = data[0]
+    return {
+        "phase": latest_phase["Phase"],
+        "date": latest_phase["Date"],
+        "time": latest_phase["Time"]
+    }
 
 @astro_bp.route('/astronomy/moon-phase', methods=['GET'])
 def get_moon_phase():
     """Obtém informações sobre a fase da lua atual"""
     try:
-        # Usando uma API gratuita para fases da lua
-        url = "https://api.farmsense.net/v1/moonphases/"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Pega a fase mais recente
-        if data:
-            latest_phase = data[0]
-            return jsonify({
-                "phase": latest_phase["Phase"],
-                "date": latest_phase["Date"],
-                "time": latest_phase["Time"]
-            })
-        else:
+        data = cached('moon-phase', fetch_moon_phase)
+        if data is None:
             return jsonify({"error": "Nenhuma informação de fase lunar encontrada"}), 404
+        return jsonify(data)
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_iss_location():
+    url = "http://api.open-notify.org/iss-now.json"
+    response = http_client.get(url)
+    response.raise_for_status()
+    return response.json()
 
 @astro_bp.route('/astronomy/iss-location', methods=['GET'])
 def get_iss_location():
     """Obtém a localização atual da Estação Espacial Internacional"""
     try:
-        url = "http://api.open-notify.org/iss-now.json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached('iss-location', fetch_iss_location))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def fetch_people_in_space():
+    url = "http://api.open-notify.org/astros.json"
+    response = http_client.get(url)
+    response.raise_for_status()
+    return response.json()
 
 @astro_bp.route('/astronomy/people-in-space', methods=['GET'])
 def get_people_in_space():
     """Obtém informações sobre pessoas atualmente no espaço"""
     try:
-        url = "http://api.open-notify.org/astros.json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(cached('people-in-space', fetch_people_in_space))
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+@astro_bp.route('/health/upstreams', methods=['GET'])
+def get_upstream_health():
+    """Circuit breaker e orçamento de chamadas de cada API externa"""
+    breakers = http_client.breakers.snapshot()
+    metrics = http_client.metrics.snapshot()
+    upstreams = {name: dict(breaker, metrics=metrics.get(name)) for name, breaker in breakers.items()}
+    budgets = http_client.budget.snapshot()
+    for name, budget in budgets.items():
+        upstreams.setdefault(name, {})['budget'] = budget
+    degraded = any(breaker['state'] != 'closed' for breaker in breakers.values())
+    degraded = degraded or any(budget['tokens'] < 1 for budget in budgets.values())
+    return jsonify({"status": "degraded" if degraded else "ok", "upstreams": upstreams})
+
+@astro_bp.route('/metrics/upstreams', methods=['GET'])
+def get_upstream_metrics():
+    """Métricas das chamadas às APIs externas (requisições, erros e latência por host)"""
+    return jsonify(http_client.metrics.snapshot())
 
+@astro_bp.route('/metrics/caches', methods=['GET'])
+def get_cache_metrics():
+    """Estatísticas dos caches de respostas externas"""
+    return jsonify({
+        "pokemon": pokemon_cache.stats(),
+        "responses": response_cache.stats()
+    })
@@ -1,5 +1,5 @@
 // Local: frontend/src/App.jsx
-import React, { useState, useEffect, useMemo, useCallback } from 'react';
+import React, { useState, useEffect, useMemo, useCallback, useRef } from 'react';
 import axios from 'axios';
 import { PieChart, Pie, Cell, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { Menu, X, Plus, PieChart as PieChartIcon, List, Edit2, Trash2 } from 'lucide-react';
@@ -7,8 +7,17 @@ import { Menu, X, Plus, PieChart as PieChartIcon, List, Edit2, Trash2 } from 'lu
 // --- Constantes ---
 const API_BASE_URL = '/api'; // O proxy do Vite vai redirecionar
 const POMODORO_TIME = 25 * 60;
+const TASKS_PAGE_SIZE = 200;
 const CHART_COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#AF19FF', '#FF1943'];
 
+// Aplica uma lista de linhas alteradas sobre o estado local, mantendo a ordem por id
+const mergeById = (current, changed, removedIds = []) => {
+    const byId = new Map(current.map(item => [item.id, item]));
+    removedIds.forEach(id => byId.delete(id));
+    changed.forEach(item => byId.set(item.id, item));
+    return Array.from(byId.values()).sort((a, b) => a.id - b.id);
+};
+
 // --- Componentes da UI ---
 
 const Sidebar = ({ currentView, setCurrentView, isOpen, setIsOpen }) => {
@@ -65,7 +74,7 @@ const PomodoroTimer = ({ task, onTimeUpdate }) => {
         } else if (timeLeft === 0 && isActive) {
             clearInterval(interval);
             setIsActive(false);
-            onTimeUpdate(task.id, task.pomodoro_time_spent + POMODORO_TIME);
+            onTimeUpdate(task.id, POMODORO_TIME);
             alert(`Sessão Pomodoro para "${task.title}" concluída!`);
             setTimeLeft(POMODORO_TIME);
         }
@@ -115,22 +124,18 @@ const CategoryChart = ({ data }) => {
 
 // --- Views (Telas) ---
 
-const DashboardView = ({ tasks }) => {
+const DashboardView = ({ stats }) => {
+    // Os agregados chegam prontos de /api/stats; aqui só adaptamos para o gráfico
     const chartData = useMemo(() => {
-        // CORREÇÃO: Adiciona uma verificação para garantir que 'tasks' é um array.
-        if (!Array.isArray(tasks)) return [];
+        if (!stats || !Array.isArray(stats.categories)) return [];
+        return stats.categories
+            .filter(cat => cat.pomodoro_time_spent > 0)
+            .map(cat => ({ name: cat.name, value: cat.pomodoro_time_spent / 60 }));
+    }, [stats]);
 
-        const timeByCat = tasks.reduce((acc, task) => {
-            acc[task.category_name] = (acc[task.category_name] || 0) + task.pomodoro_time_spent;
-            return acc;
-        }, {});
-        return Object.entries(timeByCat).filter(([, time]) => time > 0).map(([name, time]) => ({ name, value: time / 60 }));
-    }, [tasks]);
-
-    // CORREÇÃO: Verificações também adicionadas aqui.
-    const totalTime = useMemo(() => Array.isArray(tasks) ? tasks.reduce((sum, task) => sum + task.pomodoro_time_spent, 0) / 60 : 0, [tasks]);
-    const completedTasks = useMemo(() => Array.isArray(tasks) ? tasks.filter(t => t.completed).length : 0, [tasks]);
-    const totalTasks = useMemo(() => Array.isArray(tasks) ? tasks.length : 0, [tasks]);
+    const totalTime = stats ? stats.pomodoro_time_spent / 60 : 0;
+    const completedTasks = stats ? stats.completed_tasks : 0;
+    const totalTasks = stats ? stats.total_tasks : 0;
 
     return (
         <div>
@@ -246,34 +251,66 @@ const ManageView = ({ categories, onAddTask, onAddCategory }) => {
 function App() {
     const [tasks, setTasks] = useState([]);
     const [categories, setCategories] = useState([]);
+    const [stats, setStats] = useState(null);
     const [error, setError] = useState('');
     const [currentView, setCurrentView] = useState('dashboard'); // dashboard, tasks, manage
     const [isSidebarOpen, setIsSidebarOpen] = useState(false);
+    // Última versão de sincronização já aplicada no estado local
+    const syncVersion = useRef(0);
+
+    // Percorre as páginas de /tasks pelo cursor, exibindo cada página assim que chega
+    const fetchTasks = useCallback(async () => {
+        let loaded = [];
+        let cursor = null;
+        do {
+            const params = { limit: TASKS_PAGE_SIZE };
+            if (cursor) params.after = cursor;
+            const res = await axios.get(`${API_BASE_URL}/tasks`, { params });
+            if (!cursor) syncVersion.current = res.data.version;
+            loaded = loaded.concat(res.data.tasks);
+            setTasks(loaded);
+            cursor = res.data.next_cursor;
+        } while (cursor);
+    }, []);
 
     const fetchData = useCallback(async () => {
         try {
             setError('');
-            const [tasksRes, categoriesRes] = await Promise.all([
-                axios.get(`${API_BASE_URL}/tasks`),
-                axios.get(`${API_BASE_URL}/categories`)
+            const [, categoriesRes, statsRes] = await Promise.all([
+                fetchTasks(),
+                axios.get(`${API_BASE_URL}/categories`),
+                axios.get(`${API_BASE_URL}/stats`)
             ]);
-            setTasks(tasksRes.data);
             setCategories(categoriesRes.data);
+            setStats(statsRes.data);
         } catch (err) {
             setError('Falha ao buscar dados do servidor.');
             console.error(err);
         }
-    }, []);
+    }, [fetchTasks]);
 
     useEffect(() => {
         fetchData();
     }, [fetchData]);
 
+    // Busca só o que mudou desde a última versão conhecida
+    const syncChanges = useCallback(async () => {
+        const [syncRes, statsRes] = await Promise.all([
+            axios.get(`${API_BASE_URL}/sync`, { params: { since: syncVersion.current } }),
+            axios.get(`${API_BASE_URL}/stats`)
+        ]);
+        const { version, tasks: changedTasks, categories: changedCategories, deleted } = syncRes.data;
+        setTasks(prev => mergeById(prev, changedTasks, deleted.tasks));
+        setCategories(prev => mergeById(prev, changedCategories));
+        setStats(statsRes.data);
+        syncVersion.current = version;
+    }, []);
+
     const handleApiCall = async (apiCall) => {
         try {
             setError('');
             await apiCall();
-            await fetchData();
+            await syncChanges();
         } catch (err) {
             const errorMessage = err.response?.data?.error || `Falha na operação: ${err.message}`;
             setError(errorMessage);
@@ -285,7 +322,12 @@ function App() {
     const addCategory = (catData) => handleApiCall(() => axios.post(`${API_BASE_URL}/categories`, catData));
     const deleteTask = (id) => handleApiCall(() => axios.delete(`${API_BASE_URL}/tasks/${id}`));
     const toggleTask = (task) => handleApiCall(() => axios.put(`${API_BASE_URL}/tasks/${task.id}`, { completed: !task.completed }));
-    const updatePomodoro = (id, time) => handleApiCall(() => axios.put(`${API_BASE_URL}/tasks/${id}`, { pomodoro_time_spent: time }));
+    // O servidor soma o incremento de forma atômica (e pode gravá-lo em lote),
+    // então o tempo local é atualizado de forma otimista
+    const updatePomodoro = (id, seconds) => handleApiCall(async () => {
+        await axios.post(`${API_BASE_URL}/tasks/${id}/pomodoro`, { seconds });
+        setTasks(prev => prev.map(t => t.id === id ? { ...t, pomodoro_time_spent: t.pomodoro_time_spent + seconds } : t));
+    });
 
     const renderView = () => {
         switch (currentView) {
@@ -295,7 +337,7 @@ function App() {
                 return <ManageView categories={categories} onAddTask={addTask} onAddCategory={addCategory} />;
             case 'dashboard':
             default:
-                return <DashboardView tasks={tasks} />;
+                return <DashboardView stats={stats} />;
         }
     };
 
@@ -0,0 +1,10 @@
+"""
+Infraestrutura comum aos apps do repositório (API Pikachu em
+`Pikachu-Rest-API/`, Astro System em `astro-system/`, backend do TodoApp em
+`api/src/backend/`): perfis do SQLite, GET condicional, arquivos estáticos,
+o launcher do gunicorn e o acesso às APIs externas (cliente HTTP, circuit
+breaker, orçamento de chamadas e caches de respostas e de Pokémon).
+
+Cada app põe a raiz do repositório no `sys.path` ao iniciar e importa daqui
+(`from shared.db_config import ...`), então há uma cópia só de cada módulo.
+"""
@@ -0,0 +1,163 @@
+"""
+Circuit breaker por upstream para o cliente HTTP compartilhado.
+
+Cada host tem uma janela deslizante (CIRCUIT_WINDOW segundos) com o
+resultado e a latência das últimas chamadas. Com pelo menos
+CIRCUIT_MIN_REQUESTS chamadas na janela, o circuito abre quando a taxa de
+erro (exceção ou HTTP 5xx) ou a de chamadas lentas passa do limite. Aberto,
+ele falha na hora com `CircuitOpenError` em vez de prender um worker
+esperando o timeout. Depois de CIRCUIT_OPEN_SECONDS passa a meio-aberto e
+deixa passar uma chamada de teste: sucesso fecha o circuito, falha reabre.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+WINDOW = float(os.environ.get('CIRCUIT_WINDOW', 60))
+MIN_REQUESTS = int(os.environ.get('CIRCUIT_MIN_REQUESTS', 5))
+ERROR_THRESHOLD = float(os.environ.get('CIRCUIT_ERROR_THRESHOLD', 0.5))
+SLOW_CALL_SECONDS = float(os.environ.get('CIRCUIT_SLOW_CALL', 5))
+SLOW_THRESHOLD = float(os.environ.get('CIRCUIT_SLOW_THRESHOLD', 0.8))
+OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', 30))
+HALF_OPEN_PROBES = int(os.environ.get('CIRCUIT_HALF_OPEN_PROBES', 1))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """O circuito do upstream está aberto; a chamada nem foi feita"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after  # segundos até a próxima chamada de teste
+
+
+class CircuitBreaker:
+    """Estado fechado/aberto/meio-aberto de um upstream"""
+
+    def __init__(self, name, window=WINDOW, min_requests=MIN_REQUESTS, error_threshold=ERROR_THRESHOLD,
+                 slow_call_seconds=SLOW_CALL_SECONDS, slow_threshold=SLOW_THRESHOLD,
+                 open_seconds=OPEN_SECONDS, half_open_probes=HALF_OPEN_PROBES):
+        self.name = name
+        self.window = window
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_threshold = slow_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.lock = threading.Lock()
+        self.calls = deque()  # (instante, ok, segundos)
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes = 0
+        self.rejected = 0
+        self.last_failure = None
+
+    def before_request(self):
+        """Libera a chamada ou levanta CircuitOpenError"""
+        with self.lock:
+            if self.state == OPEN:
+                remaining = self.open_seconds - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(f'circuito aberto para {self.name}', retry_after=remaining)
+                self.state = HALF_OPEN
+                self.probes = 0
+            if self.state == HALF_OPEN:
+                if self.probes >= self.half_open_probes:
+                    self.rejected += 1
+                    raise CircuitOpenError(f'circuito meio-aberto para {self.name}, aguardando teste', retry_after=1)
+                self.probes += 1
+
+    def record(self, ok, elapsed, error=None):
+        now = time.monotonic()
+        with self.lock:
+            if not ok:
+                self.last_failure = error
+            if self.state == HALF_OPEN:
+                self.probes = max(self.probes - 1, 0)
+                if ok and elapsed < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self.calls.clear()
+                else:
+                    self.trip(now)
+                return
+            if self.state == OPEN:
+                # Resposta de uma chamada iniciada antes de o circuito abrir
+                return
+            self.calls.append((now, ok, elapsed))
+            self.prune(now)
+            total, errors, slow = self.counts()
+            if total >= self.min_requests and (
+                errors / total >= self.error_threshold or slow / total >= self.slow_threshold
+            ):
+                self.trip(now)
+
+    def release(self):
+        """Devolve a vaga de teste de uma chamada que não terminou (cancelada)"""
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.probes = max(self.probes - 1, 0)
+
+    def trip(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.probes = 0
+
+    def prune(self, now):
+        while self.calls and now - self.calls[0][0] > self.window:
+            self.calls.popleft()
+
+    def counts(self):
+        total = len(self.calls)
+        errors = sum(1 for _, ok, _ in self.calls if not ok)
+        slow = sum(1 for _, _, elapsed in self.calls if elapsed >= self.slow_call_seconds)
+        return total, errors, slow
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            self.prune(now)
+            total, errors, slow = self.counts()
+            latencies = [elapsed for _, _, elapsed in self.calls]
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(self.open_seconds - (now - self.opened_at), 0), 1)
+            return {
+                'state': self.state,
+                'window_requests': total,
+                'error_rate': round(errors / total, 3) if total else 0.0,
+                'slow_rate': round(slow / total, 3) if total else 0.0,
+                'avg_ms': round(sum(latencies) / total * 1000, 1) if total else 0.0,
+                'rejected': self.rejected,
+                'retry_in': retry_in,
+                'last_failure': self.last_failure,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Um CircuitBreaker por upstream, criado na primeira chamada"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.lock = threading.Lock()
+        self.breakers = {}
+
+    def get(self, upstream):
+        with self.lock:
+            breaker = self.breakers.get(upstream)
+            if breaker is None:
+                breaker = self.breakers[upstream] = CircuitBreaker(upstream, **self.options)
+            return breaker
+
+    def snapshot(self):
+        with self.lock:
+            breakers = dict(self.breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
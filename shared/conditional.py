@@ -0,0 +1,75 @@
+"""
+GET condicional (ETag / If-None-Match) para endpoints JSON de listagem.
+
+O ETag é derivado de um número de versão barato de consultar (não do corpo
+da resposta), então uma requisição com o ETag atual recebe 304 antes de o
+handler rodar: nenhuma linha é carregada nem serializada.
+"""
+
+import hashlib
+
+from flask import Blueprint, g, make_response, request
+
+
+class ConditionalGet:
+    """Liga ETags por versão a endpoints de um app ou blueprint Flask.
+
+    Uso:
+        conditional = ConditionalGet(api_bp)
+        conditional.track('get_tasks', current_version)
+
+    `version_fn` deve ser uma consulta leve (um contador, um MAX indexado).
+    Os handlers não precisam ser alterados: a checagem roda em
+    `before_request` e o ETag é anexado em `after_request`.
+    """
+
+    def __init__(self, app=None, cache_control='no-cache'):
+        self.cache_control = cache_control
+        self.version_fns = {}
+        self.prefix = ''
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Endpoints de blueprint são registrados como "<blueprint>.<view>"
+        if isinstance(app, Blueprint):
+            self.prefix = f'{app.name}.'
+        app.before_request(self.check_not_modified)
+        app.after_request(self.add_etag)
+
+    def track(self, endpoint, version_fn):
+        """Passa a responder GETs de `endpoint` com ETag baseado em `version_fn`"""
+        self.version_fns[self.prefix + endpoint] = version_fn
+
+    def etag_for(self, version):
+        # A mesma versão gera ETags diferentes para rotas/filtros diferentes
+        key = '|'.join([
+            request.endpoint or '',
+            str(version),
+            repr(sorted((request.view_args or {}).items())),
+            request.query_string.decode('latin-1'),
+        ])
+        return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+    def check_not_modified(self):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        version_fn = self.version_fns.get(request.endpoint)
+        if version_fn is None:
+            return None
+
+        etag = self.etag_for(version_fn())
+        g.conditional_etag = etag
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = self.cache_control
+            return response
+        return None
+
+    def add_etag(self, response):
+        etag = g.pop('conditional_etag', None)
+        if etag and response.status_code == 200:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = self.cache_control
+        return response
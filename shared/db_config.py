@@ -0,0 +1,129 @@
+"""
+Perfis de configuração do SQLite para Flask-SQLAlchemy.
+
+O perfil é escolhido pela variável de ambiente DB_PROFILE:
+
+- development (padrão): journal padrão do SQLite, só com busy_timeout para
+  não falhar de cara com "database is locked".
+- production: WAL (leitores não bloqueiam atrás do escritor), synchronous
+  NORMAL, cache de páginas e mmap maiores e um pool de conexões dimensionado
+  para os threads de cada worker.
+
+Os PRAGMAs são aplicados em toda conexão nova do pool. Ajustes finos via
+ambiente: DATABASE_URL, SQLITE_BUSY_TIMEOUT (ms), SQLITE_CACHE_SIZE (KiB),
+SQLITE_MMAP_SIZE (bytes), DB_POOL_SIZE e DB_MAX_OVERFLOW.
+"""
+
+import os
+
+from sqlalchemy import event
+
+DEFAULT_PROFILE = 'development'
+
+PROFILES = {
+    'development': {
+        'pragmas': {
+            'busy_timeout': 5000,
+        },
+        'pool_size': 5,
+        'max_overflow': 10,
+    },
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'cache_size': -64000,      # negativo = KiB (64 MiB)
+            'mmap_size': 268435456,    # 256 MiB
+            'temp_store': 'MEMORY',
+        },
+        'pool_size': 10,
+        'max_overflow': 20,
+    },
+}
+
+ENV_PRAGMAS = {
+    'SQLITE_BUSY_TIMEOUT': 'busy_timeout',
+    'SQLITE_MMAP_SIZE': 'mmap_size',
+}
+
+
+def get_profile(name=None):
+    """Retorna (nome, configuração) do perfil, aplicando overrides do ambiente"""
+    name = name or os.environ.get('DB_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"DB_PROFILE inválido: {name!r} (use {', '.join(PROFILES)})")
+
+    profile = dict(PROFILES[name])
+    pragmas = dict(profile['pragmas'])
+    for env_name, pragma in ENV_PRAGMAS.items():
+        if os.environ.get(env_name):
+            pragmas[pragma] = int(os.environ[env_name])
+    if os.environ.get('SQLITE_CACHE_SIZE'):
+        pragmas['cache_size'] = -int(os.environ['SQLITE_CACHE_SIZE'])
+    profile['pragmas'] = pragmas
+    profile['pool_size'] = int(os.environ.get('DB_POOL_SIZE', profile['pool_size']))
+    profile['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', profile['max_overflow']))
+    return name, profile
+
+
+def database_uri(default_path):
+    """URI do banco: DATABASE_URL se definida, senão o arquivo SQLite padrão"""
+    return os.environ.get('DATABASE_URL') or f'sqlite:///{default_path}'
+
+
+def is_memory_database(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+
+def engine_options(uri, profile):
+    """Opções de engine (SQLALCHEMY_ENGINE_OPTIONS) para o perfil"""
+    if is_memory_database(uri):
+        # Banco em memória usa o pool próprio do SQLAlchemy; não há o que ajustar
+        return {}
+    options = {
+        'pool_size': profile['pool_size'],
+        'max_overflow': profile['max_overflow'],
+        'pool_timeout': 30,
+    }
+    if not uri.startswith('sqlite'):
+        return options
+    busy_timeout = profile['pragmas'].get('busy_timeout', 5000)
+    options['connect_args'] = {
+        # Tempo que o driver espera pelo lock antes de "database is locked"
+        'timeout': busy_timeout / 1000,
+        # Conexões do pool circulam entre os threads do servidor
+        'check_same_thread': False,
+    }
+    return options
+
+
+def install_pragmas(engine, pragmas):
+    """Executa os PRAGMAs em cada conexão nova do engine"""
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return set_sqlite_pragmas
+
+
+def configure_database(app, default_path, profile_name=None):
+    """Define URI e opções de engine no app.config (antes de `db.init_app`)"""
+    name, profile = get_profile(profile_name)
+    uri = database_uri(default_path)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri, profile)
+    app.config['DB_PROFILE'] = name
+    app.config['SQLITE_PRAGMAS'] = profile['pragmas']
+    return name
+
+
+def init_database(app, db):
+    """Liga os PRAGMAs do perfil ao engine já criado por `db.init_app`"""
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            install_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS', {}))
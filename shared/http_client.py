@@ -0,0 +1,146 @@
+"""
+Cliente HTTP compartilhado para as chamadas às APIs externas.
+
+Em vez de `requests.get` solto (uma conexão TCP+TLS nova por chamada e sem
+timeout), todas as rotas usam a mesma `requests.Session`, com:
+
+- pool de conexões keep-alive por host;
+- timeout de conexão e de leitura em toda requisição;
+- retries limitados com backoff exponencial para falhas de conexão e
+  respostas 502/503/504 (apenas métodos idempotentes);
+- métricas por upstream (host): requisições, erros e latência;
+- circuit breaker por upstream (`circuit_breaker.py`): com o host fora do
+  ar, a chamada falha na hora com `CircuitOpenError`;
+- orçamento de chamadas por upstream (`rate_budget.py`), compartilhado entre
+  os workers e corrigido pelos cabeçalhos X-RateLimit-*.
+
+Ajustes via ambiente: HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT (segundos),
+HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR e HTTP_POOL_MAXSIZE.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from shared.circuit_breaker import CircuitBreakerRegistry
+from shared.rate_budget import RateBudgetExceeded, rate_budget
+
+CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.3))
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 20))
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class UpstreamMetrics:
+    """Contadores de requisições, erros e latência por upstream"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.upstreams = {}
+
+    def record(self, upstream, elapsed, status=None, error=None):
+        with self.lock:
+            stats = self.upstreams.setdefault(upstream, {
+                'requests': 0,
+                'errors': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'last_status': None,
+                'last_error': None,
+            })
+            elapsed_ms = elapsed * 1000
+            stats['requests'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['last_status'] = status
+            if error is not None or (status is not None and status >= 500):
+                stats['errors'] += 1
+                stats['last_error'] = error or f'HTTP {status}'
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                upstream: {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['requests'], 1) if stats['requests'] else 0.0,
+                    'max_ms': round(stats['max_ms'], 1),
+                    'last_status': stats['last_status'],
+                    'last_error': stats['last_error'],
+                }
+                for upstream, stats in self.upstreams.items()
+            }
+
+
+class HttpClient:
+    """Sessão HTTP com pool, timeouts, retries e métricas por upstream"""
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, pool_maxsize=POOL_MAXSIZE, budget=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.metrics = UpstreamMetrics()
+        self.breakers = CircuitBreakerRegistry()
+        self.budget = budget or rate_budget
+        self.session = requests.Session()
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @staticmethod
+    def upstream_name(url):
+        return urlsplit(url).netloc
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        upstream = self.upstream_name(url)
+        breaker = self.breakers.get(upstream)
+        # Circuito aberto falha antes de gastar ficha do orçamento
+        breaker.before_request()
+        try:
+            self.budget.acquire(upstream)
+        except RateBudgetExceeded:
+            breaker.release()
+            raise
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            elapsed = time.monotonic() - start
+            self.metrics.record(upstream, elapsed, error=type(e).__name__)
+            breaker.record(False, elapsed, error=type(e).__name__)
+            raise
+        elapsed = time.monotonic() - start
+        self.metrics.record(upstream, elapsed, status=response.status_code)
+        breaker.record(response.status_code < 500, elapsed, error=f'HTTP {response.status_code}')
+        self.budget.observe(upstream, response.headers, response.status_code)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+# Instância única compartilhada por todas as rotas do processo
+http_client = HttpClient()
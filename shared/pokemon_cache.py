@@ -0,0 +1,160 @@
+"""
+Cache dos Pokémon já simplificados (payload retornado pelas rotas).
+
+Dados da PokeAPI praticamente não mudam, então cada Pokémon fica em memória
+por um TTL longo, com despejo LRU quando o total passa do teto de bytes.
+A entrada é indexada pelo ID e o nome em minúsculas aponta para ela, de modo
+que `/pokemon/pikachu` e `/pokemon/25` compartilham o mesmo registro.
+
+Opcionalmente há uma camada em disco (SQLite) para que um worker reiniciado
+já comece aquecido: basta definir POKEMON_CACHE_PATH. Outros ajustes:
+POKEMON_CACHE_TTL (segundos) e POKEMON_CACHE_MAX_BYTES.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+class PokemonCache:
+    """LRU em memória com TTL e teto de memória, mais camada SQLite opcional"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, disk_path=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # id -> (expires_at, payload, size)
+        self.names = {}  # nome -> id
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_path:
+            self.init_disk()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=int(os.environ.get('POKEMON_CACHE_TTL', DEFAULT_TTL)),
+            max_bytes=int(os.environ.get('POKEMON_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+            disk_path=os.environ.get('POKEMON_CACHE_PATH') or None,
+        )
+
+    @staticmethod
+    def normalize(identifier):
+        """ID inteiro ou nome em minúsculas"""
+        identifier = str(identifier).strip().lower()
+        return int(identifier) if identifier.isdigit() else identifier
+
+    def get(self, identifier):
+        key = self.normalize(identifier)
+        now = time.time()
+        with self.lock:
+            pokemon_id = key if isinstance(key, int) else self.names.get(key)
+            entry = self.entries.get(pokemon_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self.entries.move_to_end(pokemon_id)
+                    self.hits += 1
+                    return entry[1]
+                self.remove(pokemon_id)
+
+        payload = self.disk_get(key, now) if self.disk_path else None
+        with self.lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.store(payload, now + self.ttl)
+        return payload
+
+    def put(self, payload):
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self.store(payload, expires_at)
+        if self.disk_path:
+            self.disk_put(payload, expires_at)
+
+    def store(self, payload, expires_at):
+        """Insere na memória e despeja os menos usados (chamar com o lock)"""
+        pokemon_id = payload['id']
+        if pokemon_id in self.entries:
+            self.remove(pokemon_id)
+        size = len(json.dumps(payload))
+        self.entries[pokemon_id] = (expires_at, payload, size)
+        self.names[payload['name'].lower()] = pokemon_id
+        self.size += size
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, pokemon_id):
+        _, payload, size = self.entries.pop(pokemon_id)
+        self.names.pop(payload['name'].lower(), None)
+        self.size -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.names.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk': bool(self.disk_path),
+            }
+
+    # Camada em disco ---------------------------------------------------
+
+    def connect(self):
+        return sqlite3.connect(self.disk_path, timeout=5)
+
+    def init_disk(self):
+        directory = os.path.dirname(self.disk_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS pokemon ('
+                'id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, '
+                'payload TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+
+    def disk_get(self, key, now):
+        column = 'id' if isinstance(key, int) else 'name'
+        try:
+            with self.connect() as conn:
+                row = conn.execute(
+                    f'SELECT payload FROM pokemon WHERE {column} = ? AND expires_at > ?', (key, now)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def disk_put(self, payload, expires_at):
+        try:
+            with self.connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO pokemon (id, name, payload, expires_at) VALUES (?, ?, ?, ?)',
+                    (payload['id'], payload['name'].lower(), json.dumps(payload), expires_at),
+                )
+        except sqlite3.Error:
+            # O disco é só uma otimização; a resposta já está em memória
+            pass
+
+
+pokemon_cache = PokemonCache.from_env()
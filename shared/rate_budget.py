@@ -0,0 +1,214 @@
+"""
+Orçamento de chamadas (token bucket) por upstream, compartilhado entre os
+processos através de um arquivo SQLite.
+
+Cada upstream com limite conhecido tem um balde de `capacity` fichas que se
+recarrega continuamente (`per_hour` fichas por hora). Toda chamada gasta uma
+ficha; os cabeçalhos `X-RateLimit-Remaining`/`X-RateLimit-Limit` da resposta
+corrigem o saldo pelo valor real do upstream, e um 429 zera o saldo até o
+`Retry-After`. Sem ficha, a chamada espera até RATE_BUDGET_MAX_WAIT segundos
+pela próxima; se não der, levanta `RateBudgetExceeded` e o cache de respostas
+serve a última resposta boa.
+
+O arquivo (RATE_BUDGET_PATH, padrão no diretório temporário) é o mesmo para
+todos os workers da máquina, então o limite vale para o deploy inteiro.
+O limite da NASA segue a chave: 30/h com DEMO_KEY, 1000/h com chave própria
+(NASA_RATE_LIMIT_PER_HOUR muda isso).
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import requests
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'pikachu-rate-budget.db')
+MAX_WAIT = float(os.environ.get('RATE_BUDGET_MAX_WAIT', 2.0))
+
+
+def default_limits():
+    """Fichas por hora dos upstreams com limite conhecido"""
+    nasa_key = os.environ.get('NASA_API_KEY', 'DEMO_KEY')
+    nasa_per_hour = 30 if nasa_key == 'DEMO_KEY' else 1000
+    return {
+        'api.nasa.gov': int(os.environ.get('NASA_RATE_LIMIT_PER_HOUR', nasa_per_hour)),
+    }
+
+
+class RateBudgetExceeded(requests.exceptions.ConnectionError):
+    """Sem orçamento para chamar o upstream agora"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after  # segundos até a próxima ficha
+
+
+class RateBudget:
+    """Token buckets por upstream guardados em SQLite"""
+
+    def __init__(self, path=DEFAULT_PATH, limits=None, max_wait=MAX_WAIT):
+        self.path = path
+        self.limits = default_limits() if limits is None else limits
+        self.max_wait = max_wait
+        self.local = threading.local()
+        self.initialized = False
+        self.init_lock = threading.Lock()
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self.local.conn = conn
+        if not self.initialized:
+            with self.init_lock:
+                if not self.initialized:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS rate_budget ('
+                        'upstream TEXT PRIMARY KEY, tokens REAL NOT NULL, capacity REAL NOT NULL, '
+                        'per_second REAL NOT NULL, updated_at REAL NOT NULL, blocked_until REAL NOT NULL DEFAULT 0, '
+                        'header_remaining INTEGER, header_limit INTEGER, header_at REAL, calls INTEGER NOT NULL DEFAULT 0, '
+                        'rejected INTEGER NOT NULL DEFAULT 0)'
+                    )
+                    self.initialized = True
+        return conn
+
+    def load(self, conn, upstream, now):
+        """Linha do upstream já recarregada até `now`; None se não houver limite"""
+        row = conn.execute(
+            'SELECT tokens, capacity, per_second, updated_at, blocked_until FROM rate_budget WHERE upstream = ?',
+            (upstream,),
+        ).fetchone()
+        if row is None:
+            per_hour = self.limits.get(upstream)
+            if per_hour is None:
+                return None
+            row = (float(per_hour), float(per_hour), per_hour / 3600, now, 0.0)
+            conn.execute(
+                'INSERT INTO rate_budget (upstream, tokens, capacity, per_second, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (upstream, *row[:4]),
+            )
+        tokens, capacity, per_second, updated_at, blocked_until = row
+        tokens = min(capacity, tokens + max(now - updated_at, 0) * per_second)
+        return tokens, capacity, per_second, blocked_until
+
+    def try_acquire(self, upstream):
+        """Gasta uma ficha; retorna 0 se conseguiu ou os segundos até a próxima"""
+        if upstream not in self.limits:
+            return 0
+        conn = self.connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            state = self.load(conn, upstream, now)
+            if state is None:
+                return 0
+            tokens, _, per_second, blocked_until = state
+            if blocked_until > now:
+                wait = blocked_until - now
+            elif tokens >= 1:
+                conn.execute(
+                    'UPDATE rate_budget SET tokens = ?, updated_at = ?, calls = calls + 1 WHERE upstream = ?',
+                    (tokens - 1, now, upstream),
+                )
+                return 0
+            else:
+                wait = (1 - tokens) / per_second if per_second else float('inf')
+            conn.execute('UPDATE rate_budget SET rejected = rejected + 1 WHERE upstream = ?', (upstream,))
+            return wait
+        finally:
+            conn.execute('COMMIT')
+
+    def acquire(self, upstream):
+        """Espera até `max_wait` por uma ficha ou levanta RateBudgetExceeded"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(upstream)
+            if wait <= 0:
+                return
+            if waited + wait > self.max_wait:
+                raise RateBudgetExceeded(f'orçamento de chamadas esgotado para {upstream} (próxima em {wait:.0f}s)',
+                                         retry_after=wait)
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, upstream):
+        """`acquire` para o event loop: o SQLite (que pode esperar o lock) roda numa thread"""
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, upstream)
+            if wait <= 0:
+                return
+            if waited + wait > self.max_wait:
+                raise RateBudgetExceeded(f'orçamento de chamadas esgotado para {upstream} (próxima em {wait:.0f}s)',
+                                         retry_after=wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def observe(self, upstream, headers, status_code):
+        """Ajusta o saldo pelos cabeçalhos de rate limit da resposta"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        limit = headers.get('X-RateLimit-Limit')
+        if remaining is None and status_code != 429:
+            return
+        if upstream not in self.limits:
+            if limit is None or not str(limit).isdigit():
+                return
+            # Limite descoberto pelo cabeçalho: assume janela de uma hora
+            self.limits[upstream] = int(limit)
+
+        conn = self.connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            state = self.load(conn, upstream, now)
+            if state is None:
+                return
+            tokens, capacity, per_second, blocked_until = state
+            header_remaining = int(remaining) if remaining is not None and str(remaining).isdigit() else None
+            header_limit = int(limit) if limit is not None and str(limit).isdigit() else None
+            if header_remaining is not None:
+                # O upstream é a fonte da verdade; só corrige para baixo
+                tokens = min(tokens, header_remaining)
+            if status_code == 429:
+                tokens = 0
+                retry_after = headers.get('Retry-After')
+                delay = float(retry_after) if retry_after and str(retry_after).isdigit() else 60
+                blocked_until = max(blocked_until, now + delay)
+            if header_limit:
+                capacity = float(header_limit)
+            conn.execute(
+                'UPDATE rate_budget SET tokens = ?, capacity = ?, updated_at = ?, blocked_until = ?, '
+                'header_remaining = COALESCE(?, header_remaining), header_limit = COALESCE(?, header_limit), '
+                'header_at = ? WHERE upstream = ?',
+                (tokens, capacity, now, blocked_until, header_remaining, header_limit, now, upstream),
+            )
+        finally:
+            conn.execute('COMMIT')
+
+    def snapshot(self):
+        conn = self.connect()
+        now = time.time()
+        rows = conn.execute(
+            'SELECT upstream, tokens, capacity, per_second, updated_at, blocked_until, header_remaining, '
+            'header_limit, calls, rejected FROM rate_budget'
+        ).fetchall()
+        budgets = {}
+        for upstream, tokens, capacity, per_second, updated_at, blocked_until, remaining, limit, calls, rejected in rows:
+            budgets[upstream] = {
+                'tokens': round(min(capacity, tokens + max(now - updated_at, 0) * per_second), 2),
+                'capacity': capacity,
+                'per_hour': round(per_second * 3600, 1),
+                'blocked_for': round(max(blocked_until - now, 0), 1),
+                'header_remaining': remaining,
+                'header_limit': limit,
+                'calls': calls,
+                'rejected': rejected,
+            }
+        return budgets
+
+
+rate_budget = RateBudget(path=os.environ.get('RATE_BUDGET_PATH') or DEFAULT_PATH)
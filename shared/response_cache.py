@@ -0,0 +1,199 @@
+"""
+Cache de respostas externas por janela de tempo, com single-flight e
+stale-while-revalidate.
+
+Cada chave pertence a uma janela (`window` segundos: um dia para APOD e
+horóscopo, poucos segundos para a posição da ISS). Dentro da janela a
+resposta vem da memória. Quando vários requests perdem o cache ao mesmo
+tempo, só o primeiro chama o upstream; os demais esperam pelo mesmo
+resultado. Depois que a janela vira, a resposta antiga ainda é servida por
+até `stale_for` segundos enquanto uma thread em segundo plano a renova.
+Se a busca falhar (upstream fora do ar, circuito aberto), a última resposta
+boa de até `last_good_for` segundos atrás é servida no lugar do erro.
+
+As rotas assíncronas (`routes/astro_async.py`) usam `get_or_fetch_async`,
+que compartilha as mesmas entradas mas coalesce as buscas em tasks asyncio.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+class ResponseCache:
+    """Cache em memória com chaves por janela de tempo e uma busca por chave"""
+
+    def __init__(self, max_entries=256, last_good_for=DAY):
+        self.max_entries = max_entries
+        self.last_good_for = last_good_for
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # chave -> (janela, valor, guardado_em)
+        self.inflight = {}  # chave -> Future da busca em andamento
+        self.async_inflight = {}  # chave -> task asyncio da busca em andamento
+        self.counters = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'last_good': 0,
+        }
+
+    def lookup(self, key, now, window, stale_for):
+        """(achou, valor, velho) para `key` na janela atual (chamar com o lock)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None, False
+        entry_bucket, value, _ = entry
+        if entry_bucket == int(now // window):
+            self.entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return True, value, False
+        if now - (entry_bucket + 1) * window < stale_for:
+            self.counters['stale_hits'] += 1
+            return True, value, True
+        return False, None, False
+
+    def get_or_fetch(self, key, fetch, window, stale_for=0):
+        """Valor de `key` na janela atual, chamando `fetch()` no máximo uma vez.
+
+        Resultados None não são guardados.
+        """
+        now = time.time()
+        bucket = int(now // window)
+        with self.lock:
+            found, value, stale = self.lookup(key, now, window, stale_for)
+            if found:
+                if stale:
+                    self.start_refresh(key, fetch, bucket)
+                return value
+
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+                self.counters['misses'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+        return self.run(key, fetch, bucket, future)
+
+    def run(self, key, fetch, bucket, future, use_last_good=True):
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self.lock:
+                self.inflight.pop(key, None)
+                last_good = self.last_good(key) if use_last_good and isinstance(e, Exception) else None
+            if last_good is not None:
+                future.set_result(last_good)
+                return last_good
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.store(key, bucket, value)
+            self.inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def store(self, key, bucket, value):
+        """Guarda o valor e despeja as chaves mais antigas (chamar com o lock)"""
+        if value is None:
+            return
+        self.entries[key] = (bucket, value, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def last_good(self, key):
+        """Última resposta guardada, se recente o bastante (chamar com o lock)"""
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry[2] > self.last_good_for:
+            return None
+        self.counters['last_good'] += 1
+        return entry[1]
+
+    def start_refresh(self, key, fetch, bucket):
+        """Renova `key` em segundo plano, se ainda não houver busca (chamar com o lock)"""
+        if key in self.inflight:
+            return
+        future = self.inflight[key] = Future()
+        self.counters['refreshes'] += 1
+
+        def refresh():
+            try:
+                self.run(key, fetch, bucket, future, use_last_good=False)
+            except Exception:
+                # Falhou: a resposta antiga continua valendo até o fim do stale_for
+                with self.lock:
+                    self.counters['refresh_errors'] += 1
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    async def get_or_fetch_async(self, key, fetch, window, stale_for=0):
+        """Versão assíncrona de `get_or_fetch`; `fetch` é uma função async"""
+        now = time.time()
+        bucket = int(now // window)
+        with self.lock:
+            found, value, stale = self.lookup(key, now, window, stale_for)
+            if found:
+                if stale and key not in self.async_inflight:
+                    self.counters['refreshes'] += 1
+                    self.async_inflight[key] = asyncio.ensure_future(self.refresh_async(key, fetch, bucket))
+                return value
+
+            task = self.async_inflight.get(key)
+            if task is None:
+                task = self.async_inflight[key] = asyncio.ensure_future(self.run_async(key, fetch, bucket))
+                self.counters['misses'] += 1
+            else:
+                self.counters['coalesced'] += 1
+        # shield: um cliente que desconecta não cancela a busca dos outros
+        return await asyncio.shield(task)
+
+    async def run_async(self, key, fetch, bucket, use_last_good=True):
+        try:
+            value = await fetch()
+        except Exception:
+            with self.lock:
+                self.async_inflight.pop(key, None)
+                last_good = self.last_good(key) if use_last_good else None
+            if last_good is not None:
+                return last_good
+            raise
+        except BaseException:
+            with self.lock:
+                self.async_inflight.pop(key, None)
+            raise
+        with self.lock:
+            self.async_inflight.pop(key, None)
+            self.store(key, bucket, value)
+        return value
+
+    async def refresh_async(self, key, fetch, bucket):
+        try:
+            return await self.run_async(key, fetch, bucket, use_last_good=False)
+        except Exception:
+            with self.lock:
+                self.counters['refresh_errors'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries),
+                        inflight=len(self.inflight) + len(self.async_inflight))
+
+
+response_cache = ResponseCache()
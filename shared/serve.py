@@ -0,0 +1,92 @@
+"""
+Servidor de produção (gunicorn) comum aos apps do repositório.
+
+Cada app tem um `serve.py` fino que chama `main(default_app=...)` com a sua
+application factory. Sobe o app com gunicorn: vários processos (workers), cada um com um pool de
+threads, app carregado uma vez no processo mestre (preload) e debug sempre
+desligado.
+
+Com preload o código fica no mestre: SIGHUP (`kill -HUP <pid>`) troca os
+workers, mas eles voltam com o código antigo. Para publicar código novo sem
+derrubar conexões, envie SIGUSR2 ao mestre (sobe um mestre novo com o código
+atual) e depois SIGWINCH e SIGQUIT ao mestre antigo. Rodando com
+`--no-preload`, cada worker importa o app e o SIGHUP basta.
+
+Uso (pelo launcher de cada app):
+    python serve.py                          # workers = 2 * CPUs + 1
+    python serve.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+
+Workers, threads e bind também podem vir de WEB_CONCURRENCY, WEB_THREADS e
+BIND.
+"""
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+
+
+def default_workers():
+    return int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+
+def load_factory(import_path):
+    """Resolve 'modulo:funcao' para a application factory"""
+    module_name, _, factory_name = import_path.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, factory_name or 'create_app')
+
+
+def parse_args(argv=None, default_app=None):
+    parser = argparse.ArgumentParser(description='Servidor WSGI de produção (gunicorn)')
+    parser.add_argument('--app', default=default_app, required=default_app is None,
+                        help="application factory 'modulo:funcao'")
+    parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:5000'))
+    parser.add_argument('--workers', type=int, default=default_workers())
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 4)))
+    parser.add_argument('--timeout', type=int, default=30, help='segundos até um worker travado ser reiniciado')
+    parser.add_argument('--graceful-timeout', type=int, default=30)
+    parser.add_argument('--keepalive', type=int, default=5)
+    parser.add_argument('--max-requests', type=int, default=10000,
+                        help='recicla o worker após N requisições (0 desliga)')
+    parser.add_argument('--no-preload', action='store_true', help='carrega o app em cada worker')
+    parser.add_argument('--access-log', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None, default_app=None):
+    args = parse_args(argv, default_app)
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn não está instalado: pip install gunicorn")
+
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, factory, options):
+            self.factory = factory
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.factory()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': args.keepalive,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'preload_app': not args.no_preload,
+        'accesslog': '-' if args.access_log else None,
+    }
+    StandaloneApplication(load_factory(args.app), options).run()
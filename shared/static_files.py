@@ -0,0 +1,150 @@
+"""
+Entrega dos arquivos estáticos da interface web (pasta `static/` da API
+Pikachu ou o build do Vite do TodoApp) a partir de um manifesto em memória.
+
+O manifesto é montado uma vez na inicialização: cada arquivo é lido, recebe
+um ETag e, quando vale a pena, variantes gzip/brotli pré-geradas (ou lidas de
+arquivos `.gz`/`.br` já existentes ao lado do original). Cada requisição vira
+uma busca em dicionário, sem `os.path.exists` nem leitura de disco.
+Após alterar os arquivos da pasta (ou um novo `npm run build`) é preciso
+reiniciar o servidor (ou chamar `build()`) para o manifesto enxergar os
+arquivos novos.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, request, send_file
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele só há variante gzip
+    brotli = None
+
+# Nomes gerados pelo Vite com hash de conteúdo, ex.: assets/index-BkX3f9aQ.js.
+# Só a pasta `assets/` do build; apple-touch-icon.png ou my-service-worker.js
+# mudam de conteúdo sem mudar de nome e não podem ser imutáveis.
+HASHED_NAME = re.compile(r'^assets/(?:[^/]+/)*[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+(?:\.map)?$')
+COMPRESSIBLE_EXTENSIONS = {
+    '.html', '.js', '.mjs', '.css', '.json', '.map', '.svg', '.txt', '.xml', '.ico', '.wasm',
+}
+MIN_COMPRESS_SIZE = 1024
+MAX_IN_MEMORY_SIZE = 5 * 1024 * 1024
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+class StaticAsset:
+    """Um arquivo do manifesto com seus bytes e variantes comprimidas"""
+
+    def __init__(self, path, full_path, data, etag, immutable):
+        self.path = path
+        self.full_path = full_path
+        self.data = data  # None para arquivos grandes, servidos direto do disco
+        self.etag = etag
+        self.immutable = immutable
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.variants = {}
+
+    @property
+    def cache_control(self):
+        return IMMUTABLE_CACHE_CONTROL if self.immutable else REVALIDATE_CACHE_CONTROL
+
+
+class StaticManifest:
+    """Índice em memória de uma pasta de build, com fallback para o index.html"""
+
+    def __init__(self, folder, index='index.html', compress=True):
+        self.folder = folder
+        self.index_name = index
+        self.compress = compress
+        self.assets = {}
+        self.build()
+
+    @property
+    def index(self):
+        return self.assets.get(self.index_name)
+
+    def build(self):
+        assets = {}
+        if self.folder and os.path.isdir(self.folder):
+            for root, _, files in os.walk(self.folder):
+                for name in files:
+                    full_path = os.path.join(root, name)
+                    path = os.path.relpath(full_path, self.folder).replace(os.sep, '/')
+                    # Variantes pré-comprimidas são anexadas ao arquivo original
+                    if path.endswith(('.gz', '.br')) and os.path.exists(full_path[:-3]):
+                        continue
+                    assets[path] = self.load_asset(path, full_path)
+        self.assets = assets
+
+    def load_asset(self, path, full_path):
+        size = os.path.getsize(full_path)
+        immutable = bool(HASHED_NAME.match(path))
+
+        if size > MAX_IN_MEMORY_SIZE:
+            stat = os.stat(full_path)
+            etag = f'{stat.st_mtime_ns:x}-{size:x}'
+            return StaticAsset(path, full_path, None, etag, immutable)
+
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        etag = hashlib.sha1(data).hexdigest()[:20]
+        asset = StaticAsset(path, full_path, data, etag, immutable)
+
+        extension = os.path.splitext(path)[1].lower()
+        if self.compress and extension in COMPRESSIBLE_EXTENSIONS and size >= MIN_COMPRESS_SIZE:
+            for encoding, suffix, compress in (
+                ('br', '.br', (lambda raw: brotli.compress(raw, quality=11)) if brotli else None),
+                ('gzip', '.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)),
+            ):
+                precompressed = full_path + suffix
+                if os.path.exists(precompressed):
+                    with open(precompressed, 'rb') as f:
+                        variant = f.read()
+                elif compress is not None:
+                    variant = compress(data)
+                else:
+                    continue
+                # Só guarda a variante se ela realmente economizar bytes
+                if len(variant) < size:
+                    asset.variants[encoding] = variant
+        return asset
+
+    def choose_encoding(self, asset):
+        for encoding in ('br', 'gzip'):
+            if encoding in asset.variants and request.accept_encodings[encoding]:
+                return encoding
+        return None
+
+    def serve(self, path):
+        """Resposta para `path`; caminhos desconhecidos recebem o index.html.
+
+        Retorna None se nem o arquivo nem o index.html existirem.
+        """
+        asset = self.assets.get(path) if path else None
+        if asset is None:
+            asset = self.index
+            if asset is None:
+                return None
+
+        if asset.data is None:
+            response = send_file(asset.full_path, mimetype=asset.mimetype, etag=asset.etag,
+                                 conditional=True, max_age=None)
+            response.headers['Cache-Control'] = asset.cache_control
+            return response
+
+        encoding = self.choose_encoding(asset)
+        body = asset.variants[encoding] if encoding else asset.data
+        response = Response(body, mimetype=asset.mimetype)
+        response.set_etag(f'{asset.etag}-{encoding}' if encoding else asset.etag)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = asset.cache_control
+        return response.make_conditional(request)